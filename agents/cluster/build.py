@@ -1,4 +1,5 @@
 import clustering
+import neardup
 
 
 class processing:
@@ -11,6 +12,22 @@ class processing:
         self.clusters = cluster_agent.clusters_to_ids()
         self.articles_by_id = cluster_agent.articles_by_id
 
+        # urls of syndicated copies collapsed at the clean stage
+        self.alternates = neardup.load_alternates()
+
+    def story_urls(self, cluster_attr):
+
+        urls = [i.get("url", "") for i in cluster_attr]
+
+        for article in cluster_attr:
+
+            for alt in self.alternates.get(article["id"], []):
+
+                if alt.get("url") and alt["url"] not in urls:
+                    urls.append(alt["url"])
+
+        return urls
+
     def construct(self):
 
         story_candidates = []
@@ -43,7 +60,7 @@ class processing:
                 "sources": [i.get("source", "") for i in cluster_attr],
                 "timestamp": rep.get("timestamp", ""),
                 "articles": cluster_attr,
-                "urls": [i.get("url", "") for i in cluster_attr],
+                "urls": self.story_urls(cluster_attr),
                 "rep_text": rep.get("text", ""),
                 "summary": "",
                 "topics": [""],
@@ -68,13 +85,20 @@ if __name__ == "__main__":
 
     start_time = time.time()
 
+    import importlib.util
+
+    spec = importlib.util.spec_from_file_location(
+        "storage", db_dir.parent / "agents" / "storage.py"
+    )
+    storage = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(storage)
+
     proc = processing(threshold=0.7)
     i, art = proc.construct()
-    with open(db_dir / "story_candidates.json", "w", encoding="utf-8") as f:
-
-        import json
 
-        json.dump(i, f, ensure_ascii=False, indent=4)
+    store = storage.open_storage(db_dir)
+    store.save_candidates(i)
+    store.close()
 
     end_time = time.time()
     print(f"Processing time: {end_time - start_time} seconds")
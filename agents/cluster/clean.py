@@ -1,88 +1,208 @@
 import importlib.util
 from pathlib import Path
-import hashlib, time, re, os
-from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
-import datetime as dt
-from dateutil import parser as dateparser
+import hashlib, time, re, os, sys
+import multiprocessing
+from urllib.parse import urlparse
 import json
 import datetime
+from collections import deque
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
 
 ROOT_DIR = Path(__file__).parent.parent.parent
 LIB_DIR = ROOT_DIR / "data" / "agents"
-LIB_NAME = "process_yml"
+spec_cache = importlib.util.spec_from_file_location(
+    "clean_cache", Path(__file__).parent / "clean_cache.py"
+)
+clean_cache = importlib.util.module_from_spec(spec_cache)
+spec_cache.loader.exec_module(clean_cache)
 
-spec = importlib.util.spec_from_file_location(LIB_NAME, LIB_DIR / f"{LIB_NAME}.py")
-process_yml = importlib.util.module_from_spec(spec)
-spec.loader.exec_module(process_yml)
+spec_canon = importlib.util.spec_from_file_location(
+    "canonical", LIB_DIR / "canonical.py"
+)
+canonical = importlib.util.module_from_spec(spec_canon)
+spec_canon.loader.exec_module(canonical)
 
-proc = process_yml.processer()
+spec_time = importlib.util.spec_from_file_location(
+    "timeparse", LIB_DIR / "timeparse.py"
+)
+timeparse = importlib.util.module_from_spec(spec_time)
+spec_time.loader.exec_module(timeparse)
+
+_proc_instance = None
+
+
+def get_proc():
+
+    # the feeds config, fetcher and scheduler are only built when articles are
+    # actually fetched, so importing this module (or a pool worker) stays cheap
+    global _proc_instance
+
+    if _proc_instance is None:
+
+        spec = importlib.util.spec_from_file_location(
+            "process_yml", LIB_DIR / "process_yml.py"
+        )
+        process_yml = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(process_yml)
+        _proc_instance = process_yml.processer()
+
+    return _proc_instance
+
+
+_processing = None
+
+
+def load_processing():
+
+    # processing.py is resolved once per process, not on every sanitize_text call;
+    # a failed import is remembered as False so it is not retried per article
+    global _processing
+
+    if _processing is None:
+
+        try:
+            import processing as _proc
+        except Exception:
+            try:
+                spec_proc = importlib.util.spec_from_file_location(
+                    "processing", Path(__file__).parent / "processing.py"
+                )
+                _proc = importlib.util.module_from_spec(spec_proc)
+                spec_proc.loader.exec_module(_proc)
+            except Exception:
+                _proc = False
+
+        _processing = _proc
+
+    return _processing or None
+
+
+_clean_version = None
+
+
+def clean_version() -> str:
+
+    # the rules are fixed for the life of a run, so they are hashed once
+    global _clean_version
+
+    if _clean_version is None:
+
+        _proc = load_processing()
+        _clean_version = _proc.cleaner_version() if _proc is not None else ""
+
+    return _clean_version
+
+
+_worker_cleaner = None
+
+
+def clean_batch(articles):
+
+    # runs inside a pool worker; one cleaner per worker process
+    global _worker_cleaner
+
+    if _worker_cleaner is None:
+        _worker_cleaner = cleaner()
+
+    return [_worker_cleaner.clean_one(article) for article in articles]
+
+
+def pool_can_import():
+
+    # forkserver/spawn workers unpickle clean_batch by module name, so a copy of
+    # this file loaded by path and never put in sys.modules cannot use the pool
+    module = sys.modules.get(clean_batch.__module__)
+    return getattr(module, "clean_batch", None) is clean_batch
+
+
+def skip_ids_for(indexed_ids, replay):
+
+    # a replayed archive was usually ingested already; skipping its ids would
+    # leave nothing to clean, so replay re-cleans everything (the fetcher also
+    # ignores its known entries in replay)
+    return None if replay else indexed_ids
+
+
+def rememberable(entries, indexed_ids):
+
+    # entries whose page was read, or whose article is indexed, never need their
+    # page again; failed page fetches and rejected summaries are tried next poll
+    return [e for e in entries if e.get("fulltext") or e.get("id") in indexed_ids]
+
+
+def batches(items, size):
+
+    it = iter(items)
+
+    while True:
+
+        batch = list(islice(it, size))
+
+        if not batch:
+            return
+
+        yield batch
 
 
 class cleaner:
 
-    def __init__(self):
+    def __init__(self, workers=1, chunk_size=32, cache=None):
 
-        pass
+        # workers: 1 cleans in-process, 0 uses every core, n uses n processes
+        self.workers = workers if workers else (os.cpu_count() or 1)
+        self.chunk_size = max(1, chunk_size)
+
+        # optional clean_cache.clean_cache; hits skip sanitize/boilerplate/ts work
+        self.cache = cache
+
+        # articles dropped by iter_process_articles(skip_ids=...)
+        self.skipped = 0
 
     def make_id(self, url: str, title: str) -> str:
 
         hash_input = (url + title).encode("utf-8")
         return hashlib.md5(hash_input).hexdigest()
 
+    def normalize_article(self, article):
+
+        text = article.get("text", "").strip()
+
+        if not text:
+            return None
+
+        return {
+            "id": self.make_id(
+                article.get("article_url", ""), article.get("title", "")
+            ),
+            "source": article.get("source", "Unknown").strip(),
+            "url": article.get("article_url", "").strip(),
+            "title": article.get("title", "").strip(),
+            "timestamp": article.get("timestamp", "").strip(),
+            "text": text,
+            "sources": article.get("sources", []),
+        }
+
     def normalize_articles(self, articles=None):
 
         if articles is None:
-            articles = proc.get_articales()
+            articles = get_proc().get_articales()
 
         cleaned_articles = []
 
         for article in articles:
 
-            text = article.get("text", "").strip()
+            cleaned_article = self.normalize_article(article)
 
-            if not text:
-                continue
-
-            cleaned_article = {
-                "id": self.make_id(
-                    article.get("article_url", ""), article.get("title", "")
-                ),
-                "source": article.get("source", "Unknown").strip(),
-                "url": article.get("article_url", "").strip(),
-                "title": article.get("title", "").strip(),
-                "timestamp": article.get("timestamp", "").strip(),
-                "text": text,
-            }
+            if cleaned_article is not None:
 
-            cleaned_articles.append(cleaned_article)
+                cleaned_articles.append(cleaned_article)
 
         return cleaned_articles
 
     def canonical_url(self, url: str) -> str:
 
-        if not url:
-            return ""
-        try:
-            p = urlparse(url)
-            qs = [
-                (k, v)
-                for k, v in parse_qsl(p.query, keep_blank_values=True)
-                if k.lower()
-                not in {
-                    "utm_source",
-                    "utm_medium",
-                    "utm_campaign",
-                    "utm_term",
-                    "utm_content",
-                    "fbclid",
-                    "gclid",
-                }
-            ]
-            p = p._replace(query=urlencode(qs, doseq=True), fragment="")
-            p = p._replace(netloc=p.netloc.lower())
-            return urlunparse(p)
-        except Exception:
-            return url
+        return canonical.canonical_url(url)
 
     def clean_title(self, t: str) -> str:
 
@@ -103,29 +223,28 @@ class cleaner:
 
         return s
 
-    def parse_ts(self, ts_raw):
-
-        if not ts_raw:
-
-            return None
-
-        try:
+    def pre_id(self, article) -> str:
 
-            dtv = dateparser.parse(ts_raw)
+        # the id clean_article would assign, from the url and title alone
+        url = (article.get("url") or article.get("article_url") or "").strip()
+        title = (article.get("title") or "").strip()
 
-            if dtv is None:
+        return self.make_id(self.canonical_url(url), self.clean_title(title))
 
-                return None
+    def unseen(self, articles, skip_ids):
 
-            if dtv.tzinfo is None:
+        for article in articles:
 
-                dtv = dtv.replace(tzinfo=dt.timezone.utc)
+            if self.pre_id(article) in skip_ids:
+                self.skipped += 1
+                continue
 
-            return dtv.astimezone(dt.timezone.utc).isoformat()
+            yield article
 
-        except Exception:
+    def parse_ts(self, ts_raw):
 
-            return None
+        # fetcher already stores UTC ISO 8601, which takes the stdlib fast path
+        return timeparse.to_iso(ts_raw) or None
 
     def get_rid_of_img_tags(self, text: str) -> str:
 
@@ -144,22 +263,12 @@ class cleaner:
         text = re.sub(r"[\x00-\x08\x0B\x0C\x0E-\x1F]+", " ", text)
         text = re.sub(r"<!--.*?-->", "", text, flags=re.S)
         text = self.get_rid_of_img_tags(text)
-        try:
-            import processing as _processing
-        except Exception:
-            try:
-                spec_proc = importlib.util.spec_from_file_location(
-                    "processing", Path(__file__).parent / "processing.py"
-                )
-                _processing = importlib.util.module_from_spec(spec_proc)
-                spec_proc.loader.exec_module(_processing)
-            except Exception:
-                _processing = None
+        _processing = load_processing()
 
         if _processing is not None:
             try:
-                proc = _processing.TextProcessor(text)
-                cleaned = proc.clean_text()
+                processor = _processing.TextProcessor(text)
+                cleaned = processor.clean_text()
                 if cleaned:
                     text = cleaned
             except Exception:
@@ -222,232 +331,379 @@ class cleaner:
                 return True
         return False
 
-    def process_articles(self, articles=None):
+    source_map = {
+        "nasa.gov": "NASA",
+        "jpl.nasa.gov": "JPL",
+        "esa.int": "ESA",
+        "spacenews.com": "SpaceNews",
+        "spaceflightnow.com": "SpaceflightNow",
+        "arxiv.org": "arXiv",
+    }
+
+    def clean_article(self, a):
+
+        url = a.get("url") or a.get("article_url") or ""
+        title = a.get("title") or ""
+        source = a.get("source") or ""
+        ts_raw = a.get("timestamp") or a.get("ts") or ""
+        text = a.get("text") or ""
+
+        url_c = self.canonical_url(url)
+        title_c = self.clean_title(title)
+        ts_c = self.parse_ts(ts_raw)
+        text_s = self.sanitize_text(text)
+
+        if not title_c:
+            return None
+        if len(title_c) < 8:
+            return None
+        if len(text_s) < 80:
+            return None
+        if self.is_boilerplate(text_s):
+            return None
 
-        if articles is None:
-            articles = proc.get_articales()
+        if not ts_c:
+
+            ts_try = a.get("fetch_ts") or a.get("fetched_at")
+
+            if ts_try:
+
+                ts_c = self.parse_ts(ts_try)
+
+        if not ts_c:
+
+            return None
+
+        try:
+
+            host = urlparse(url_c).netloc.lower()
+        except Exception:
 
-        first_pass = self.normalize_articles(articles)
+            host = ""
 
-        outputs = []
-        now_iso = dt.datetime.utcnow().replace(tzinfo=dt.timezone.utc).isoformat()
+        src_canon = self.source_map.get(host, source or host)
 
-        source_map = {
-            "nasa.gov": "NASA",
-            "jpl.nasa.gov": "JPL",
-            "esa.int": "ESA",
-            "spacenews.com": "SpaceNews",
-            "spaceflightnow.com": "SpaceflightNow",
-            "arxiv.org": "arXiv",
+        cleaned = {
+            "id": self.make_id(url_c, title_c),
+            "url": url_c,
+            "source": src_canon,
+            "title": title_c,
+            "timestamp": ts_c,
+            "text": text_s,
+            "text_len": len(text_s),
+            "clean_version": clean_version(),
         }
 
-        for a in first_pass:
-            url = a.get("url") or a.get("article_url") or ""
-            title = a.get("title") or ""
-            source = a.get("source") or ""
-            ts_raw = a.get("timestamp") or a.get("ts") or ""
-            text = a.get("text") or ""
+        # feeds whose copies of this url were merged into this one at ingest
+        if len(a.get("sources") or []) > 1:
+            cleaned["sources"] = a["sources"]
 
-            url_c = self.canonical_url(url)
-            title_c = self.clean_title(title)
-            ts_c = self.parse_ts(ts_raw)
-            text_s = self.sanitize_text(text)
+        return cleaned
 
-            if not title_c:
-                continue
-            if len(title_c) < 8:
-                continue
-            if len(text_s) < 80:
-                continue
-            if self.is_boilerplate(text_s):
-                continue
+    def clean_one(self, article):
 
-            if not ts_c:
+        normalized = self.normalize_article(article)
 
-                ts_try = a.get("fetch_ts") or a.get("fetched_at")
+        if normalized is None:
+            return None
 
-                if ts_try:
+        return self.clean_article(normalized)
 
-                    ts_c = self.parse_ts(ts_try)
+    def iter_process_articles(self, articles=None, skip_ids=None):
 
-            if not ts_c:
+        # cleans articles one at a time as they arrive, so a generator from
+        # processer.iter_articales overlaps cleaning with the remaining fetches.
+        # articles whose pre_id is in skip_ids never reach the cache or sanitizer
+        if articles is None:
+            articles = get_proc().iter_articales()
 
-                continue
+        if skip_ids:
+            articles = self.unseen(articles, skip_ids)
 
-            try:
+        if self.workers > 1 or self.cache is not None:
 
-                host = urlparse(url_c).netloc.lower()
-            except Exception:
+            yield from self.iter_process_batched(articles)
+            return
 
-                host = ""
+        for article in articles:
 
-            src_canon = source_map.get(host, source or host)
+            cleaned = self.clean_one(article)
 
-            cleaned = {
-                "id": self.make_id(url_c, title_c),
-                "url": url_c,
-                "source": src_canon,
-                "title": title_c,
-                "timestamp": ts_c,
-                "text": text_s,
-                "text_len": len(text_s),
-            }
+            if cleaned is not None:
 
-            outputs.append(cleaned)
+                yield cleaned
 
-        return outputs
+    def lookup(self, batch, version):
 
+        if self.cache is None:
+            return None, [clean_cache.MISS] * len(batch)
 
-if __name__ == "__main__":
+        keys = [self.cache.key(article, version) for article in batch]
+        return keys, self.cache.get_many(keys)
 
-    cleaner_instance = cleaner()
+    def finish(self, keys, results, misses, pending):
 
-    try:
+        cleaned = pending.result() if hasattr(pending, "result") else pending
 
-        raw_articles = proc.get_articales()
+        for i, value in zip(misses, cleaned):
 
-    except Exception as e:
+            results[i] = value
 
-        print(f"Failed to fetch articles, using example data: {e}")
+        if self.cache is not None and misses:
 
-        import json
+            self.cache.put_many((keys[i], results[i]) for i in misses)
 
-        with open(
-            ROOT_DIR / "data" / "agents" / "example.json", "r", encoding="utf-8"
-        ) as f:
+        return [r for r in results if r is not None]
 
-            example_data = json.load(f)
+    def iter_process_batched(self, articles):
 
-        raw_articles = []
+        # batches are first looked up in the cache; only misses are cleaned,
+        # in-process or on a process pool. results come back in input order and
+        # at most 2 batches per worker are in flight, so the input still streams
+        version = clean_version()
+        ex = None
+        in_flight = deque()
+        max_in_flight = 1
 
-        for source in example_data:
+        if self.workers > 1 and not pool_can_import():
+            print("clean.py is not importable by name here, cleaning in-process")
 
-            for article in source.get("articles", []):
+        elif self.workers > 1:
 
-                raw_articles.append(
-                    {
-                        "source": source.get("source", "Unknown"),
-                        "source_url": source.get("url", ""),
-                        "article_url": article.get("url", ""),
-                        "title": article.get("title", ""),
-                        "timestamp": article.get("ts", ""),
-                        "text": article.get("text", ""),
-                    }
-                )
+            # the fetcher's threads are already running, so workers are not
+            # forked from this process (forkserver is not on Windows)
+            methods = multiprocessing.get_all_start_methods()
+            method = "forkserver" if "forkserver" in methods else "spawn"
+
+            ex = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context(method),
+            )
+            max_in_flight = self.workers * 2
+
+        try:
+
+            for batch in batches(articles, self.chunk_size):
+
+                keys, results = self.lookup(batch, version)
+                misses = [i for i, r in enumerate(results) if r is clean_cache.MISS]
+                todo = [batch[i] for i in misses]
+
+                if ex is None or not todo:
+                    pending = [self.clean_one(article) for article in todo]
+                else:
+                    pending = ex.submit(clean_batch, todo)
+
+                in_flight.append((keys, results, misses, pending))
+
+                while len(in_flight) >= max_in_flight:
+
+                    yield from self.finish(*in_flight.popleft())
 
-    # get articles
+            while in_flight:
 
-    cleaned_articles = cleaner_instance.process_articles(raw_articles)
+                yield from self.finish(*in_flight.popleft())
+
+        finally:
+
+            if ex is not None:
+                ex.shutdown(cancel_futures=True)
+
+    def process_articles(self, articles=None, skip_ids=None):
+
+        if articles is None:
+            articles = get_proc().get_articales()
+
+        return list(self.iter_process_articles(articles, skip_ids))
+
+
+if __name__ == "__main__":
+
+    proc = get_proc()
+
+    clean_config = (proc.data.get("defaults", {}) or {}).get("clean", {}) or {}
 
     # set up/init paths
 
     db_path = ROOT_DIR / "data" / "db"
     db_path.mkdir(parents=True, exist_ok=True)
-    index_file = db_path / "index.json"
 
-    # load existing index data
+    # append-only id store; imports the legacy index.json on first use
+    spec_ids = importlib.util.spec_from_file_location(
+        "idstore", LIB_DIR / "idstore.py"
+    )
+    idstore = importlib.util.module_from_spec(spec_ids)
+    spec_ids.loader.exec_module(idstore)
 
-    try:
+    # opened before cleaning so already indexed articles skip sanitization
+    indexed_ids = idstore.id_store()
 
-        # read & create if not exist
+    # syndicated copies of one press release are collapsed into the first one
+    near = None
+    neardup_config = clean_config.get("neardup", {}) or {}
 
-        if index_file.exists():
+    if neardup_config.get("enabled", True):
 
-            with open(index_file, "r", encoding="utf-8") as f:
+        spec_near = importlib.util.spec_from_file_location(
+            "neardup", Path(__file__).parent / "neardup.py"
+        )
+        neardup = importlib.util.module_from_spec(spec_near)
+        spec_near.loader.exec_module(neardup)
+        near = neardup.neardup_index.from_config(neardup_config)
 
-                og_data = json.load(f) or {}
+    cache = None
 
-        else:
+    if clean_config.get("cache", True):
 
-            og_data = {}
-    except Exception:
+        cache = clean_cache.clean_cache(
+            max_bytes=int(clean_config.get("cache_mb", 64) * 1024**2)
+        )
 
-        og_data = {}
+    cleaner_instance = cleaner(
+        workers=clean_config.get("workers", 1),
+        chunk_size=clean_config.get("chunk_size", 32),
+        cache=cache,
+    )
 
-    # key for ids
+    # --replay re-runs the stage from data/db/archive without touching the network
+    replay = "--replay" in sys.argv or os.environ.get("SPACE_RADAR_REPLAY") == "1"
 
-    if "id" in og_data and isinstance(og_data["id"], list):
-        key = "id"
-    elif "ids" in og_data and isinstance(og_data["ids"], list):
-        key = "ids"
-    else:
-        key = "id"
+    # --poll-all ignores the per-feed schedule and polls every source
+    proc.poll_all = "--poll-all" in sys.argv
+    proc.defer_feed_cache = True
+    skip_ids = skip_ids_for(indexed_ids, replay)
 
-    og_data.setdefault(key, [])
+    fetched_live = True
+    fetched_keys = []
+    fetch_errors = []
 
-    existing_ids_before = set(og_data.get(key, []))
+    def remembered(articles):
 
-    if not index_file.exists():
-        with open(index_file, "w", encoding="utf-8") as f:
-            json.dump(og_data, f, ensure_ascii=False, indent=2)
+        # a fetch that fails before any article arrived falls back to the
+        # example data; once articles are flowing, an error ends the run
+        try:
 
-    # find new articles (not in original index)
-    new_articles = []
-    new_ids = []
+            for article in articles:
 
-    for article in cleaned_articles:
-        if article["id"] not in existing_ids_before:
-            new_articles.append(article)
-            new_ids.append(article["id"])
+                fetched_keys.append(
+                    {
+                        "article_url": article.get("article_url", ""),
+                        "guid": article.get("guid", ""),
+                        "source": article.get("source", ""),
+                        "fulltext": article.get("fulltext", False),
+                        "id": cleaner_instance.pre_id(article),
+                    }
+                )
+                yield article
 
-    # only proceed if there are new articles
+        except Exception as e:
 
-    if new_articles:
+            if fetched_keys:
+                raise
 
-        # update index with new IDs
+            fetch_errors.append(e)
 
-        updated_data = og_data.copy()
-        updated_data.setdefault(key, [])
-        if not isinstance(updated_data[key], list):
-            updated_data[key] = (
-                list(updated_data[key]) if updated_data[key] is not None else []
-            )
+    # stream: each feed is cleaned as soon as it arrives
+    cleaned_articles = list(
+        cleaner_instance.iter_process_articles(
+            remembered(proc.iter_articales(replay=replay)),
+            skip_ids=skip_ids,
+        )
+    )
 
-        updated_data[key].extend(new_ids)
+    if fetch_errors:
 
-        with open(index_file, "w", encoding="utf-8") as f:
-            json.dump(updated_data, f, ensure_ascii=False, indent=2)
+        fetched_live = False
 
-        # add new articles to date-based file
+        print(f"Failed to fetch articles, using example data: {fetch_errors[0]}")
 
-        date_folder_path = db_path / "by_date"
-        date_folder_path.mkdir(parents=True, exist_ok=True)
+        with open(
+            ROOT_DIR / "data" / "agents" / "example.json", "r", encoding="utf-8"
+        ) as f:
 
-        today_date = datetime.datetime.utcnow().strftime("%Y-%m-%d")
-        date_path = date_folder_path / f"{today_date}.json"
+            example_data = json.load(f)
 
-        # load existing date file or create empty list
+        raw_articles = []
 
-        try:
+        for source in example_data:
+
+            for article in source.get("articles", []):
+
+                raw_articles.append(
+                    {
+                        "source": source.get("source", "Unknown"),
+                        "source_url": source.get("url", ""),
+                        "article_url": article.get("url", ""),
+                        "title": article.get("title", ""),
+                        "timestamp": article.get("ts", ""),
+                        "text": article.get("text", ""),
+                    }
+                )
 
-            if date_path.exists():
+        cleaned_articles = cleaner_instance.process_articles(
+            raw_articles, skip_ids=skip_ids
+        )
 
-                with open(date_path, "r", encoding="utf-8") as f:
+    # find new articles (not in original index)
+    new_articles = []
+    new_ids = []
 
-                    existing_date_data = json.load(f)
+    for article in cleaned_articles:
+        if article["id"] not in indexed_ids:
+            original = near.collapse(article) if near is not None else None
 
-            else:
+            # copies are indexed (so later polls skip them) but not stored
+            if original is None:
+                new_articles.append(article)
 
-                existing_date_data = []
+            if article["id"] not in new_ids:
+                new_ids.append(article["id"])
 
-        except Exception:
+    # only proceed if there are new articles
 
-            existing_date_data = []
+    if new_articles:
 
-        # add new articles to date file
+        # add new articles to today's partition (json) or table (sqlite)
 
-        existing_date_data.extend(new_articles)
+        spec_store = importlib.util.spec_from_file_location(
+            "storage", LIB_DIR / "storage.py"
+        )
+        storage = importlib.util.module_from_spec(spec_store)
+        spec_store.loader.exec_module(storage)
 
-        with open(date_path, "w", encoding="utf-8") as f:
+        store = storage.open_storage(
+            db_path, (proc.data.get("defaults", {}) or {}).get("storage", {}) or {}
+        )
 
-            json.dump(existing_date_data, f, ensure_ascii=False, indent=2)
+        today_date = datetime.datetime.utcnow().strftime("%Y-%m-%d")
+        store.add_articles(new_articles, today_date)
+        store.close()
 
-        print(f"Added {len(new_articles)} new articles to {today_date}.json")
+        print(f"Added {len(new_articles)} new articles for {today_date}")
 
     else:
 
         print("No new articles to add")
 
+    # ids are recorded after the articles are stored, so a crash in between
+    # re-cleans them next run instead of losing them
+    indexed_ids.add_many(new_ids)
+    fetched_keys = rememberable(fetched_keys, indexed_ids)
+    indexed_ids.close()
+
+    if cache is not None:
+        cache.close()
+
+    if near is not None:
+        near.save()
+        print(f"Near-duplicate copies collapsed: {near.collapsed}")
+
+    # later polls can skip the pages of these entries, and the feeds' validators
+    # can be saved now that their articles are stored
+    if fetched_live:
+        proc.fetcher.remember(fetched_keys)
+        proc.fetcher.save_state()
+
     output_file = ROOT_DIR / "cleaned_articles.json"
 
     with open(output_file, "w", encoding="utf-8") as f:
@@ -455,5 +711,6 @@ if __name__ == "__main__":
         json.dump({"articles": cleaned_articles}, f, ensure_ascii=False, indent=2)
 
     print(f"Total cleaned articles: {len(cleaned_articles)}")
+    print(f"Known articles skipped before cleaning: {cleaner_instance.skipped}")
     print(f"New articles added: {len(new_articles)}")
     print(f"Output saved to: {output_file}")
@@ -0,0 +1,123 @@
+import json
+import time
+import sqlite3
+import hashlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+DB_DIR = Path(__file__).parent.parent.parent / "data" / "db"
+CACHE_FILE = DB_DIR / "clean_cache.sqlite"
+
+MISS = object()
+
+
+class clean_cache:
+
+    # memoizes cleaner.clean_one: raw article + cleaner version -> cleaned
+    # article (or None when it was rejected). least recently used rows are
+    # evicted once the stored values exceed max_bytes
+
+    def __init__(self, path: Path = CACHE_FILE, max_bytes: int = 64 * 1024**2):
+
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "size INTEGER NOT NULL, used REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS entries_used ON entries(used)")
+        self.conn.commit()
+
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, article: Dict[str, Any], version: str) -> str:
+
+        raw = json.dumps(article, sort_keys=True, ensure_ascii=False)
+
+        return hashlib.sha256(f"{version}\n{raw}".encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: List[str]) -> List[Any]:
+
+        # one entry per key: the cached value (possibly None) or MISS
+        found: Dict[str, Any] = {}
+
+        for i in range(0, len(keys), 500):
+
+            chunk = keys[i : i + 500]
+            marks = ",".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT key, value FROM entries WHERE key IN ({marks})", chunk
+            )
+
+            for key, value in rows:
+
+                found[key] = json.loads(value)
+
+        if found:
+
+            now = time.time()
+            self.conn.executemany(
+                "UPDATE entries SET used = ? WHERE key = ?",
+                [(now, key) for key in found],
+            )
+
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+
+        return [found.get(key, MISS) for key in keys]
+
+    def put_many(self, items: Iterable[Tuple[str, Optional[Dict]]]) -> None:
+
+        now = time.time()
+        rows = []
+
+        for key, value in items:
+
+            data = json.dumps(value, ensure_ascii=False)
+            rows.append((key, data, len(data), now))
+
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO entries (key, value, size, used) "
+            "VALUES (?, ?, ?, ?)",
+            rows,
+        )
+
+    def evict(self) -> int:
+
+        total = self.conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()[0]
+
+        if total <= self.max_bytes:
+            return 0
+
+        # trim to 90% so eviction does not run again on the next few inserts
+        target = total - int(self.max_bytes * 0.9)
+        freed = 0
+        doomed = []
+
+        rows = self.conn.execute("SELECT key, size FROM entries ORDER BY used")
+
+        for key, size in rows.fetchall():
+
+            if freed >= target:
+                break
+
+            doomed.append((key,))
+            freed += size
+
+        self.conn.executemany("DELETE FROM entries WHERE key = ?", doomed)
+        return len(doomed)
+
+    def close(self) -> None:
+
+        evicted = self.evict()
+        self.conn.commit()
+        self.conn.close()
+
+        print(f"Clean cache: {self.hits} hits, {self.misses} misses, {evicted} evicted")
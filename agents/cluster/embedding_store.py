@@ -0,0 +1,220 @@
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+DB_DIR = Path(__file__).parent.parent.parent / "data" / "db"
+EMBEDDINGS_DIR = DB_DIR / "embeddings"
+
+
+def model_dir(model_name: str, root: Path = EMBEDDINGS_DIR) -> Path:
+
+    # one store per model, since dimensions and vector spaces differ
+    return Path(root) / re.sub(r"[^A-Za-z0-9._-]+", "_", model_name)
+
+
+class embedding_store:
+
+    # one contiguous (capacity, dim) .npy matrix opened as a memmap, plus an
+    # id -> [row, tag] index. appends fill spare rows and double the capacity
+    # when full; overwritten or deleted ids leave dead rows until compact().
+    # tag is free-form (the caller's cache key for that row). a grown or
+    # compacted matrix is written under a new generation name and only
+    # becomes current when index.json, which names it, is replaced
+
+    def __init__(self, root: Path, dim: Optional[int] = None, dtype: str = "float32"):
+
+        self.root = Path(root)
+        self.index_file = self.root / "index.json"
+        self.generation = 0
+        self.dtype = np.dtype(dtype)
+        self.dim = dim
+
+        self.ids: Dict[str, List] = {}
+        self.rows = 0
+        self.vectors = None
+        self.load()
+
+    def vectors_file(self, generation: int) -> Path:
+
+        return self.root / f"vectors-{generation}.npy"
+
+    def load(self) -> None:
+
+        if not self.index_file.exists():
+            return
+
+        try:
+
+            with open(self.index_file, "r", encoding="utf-8") as f:
+
+                index = json.load(f) or {}
+
+            generation = int(index.get("generation", 0))
+            vectors = np.load(self.vectors_file(generation), mmap_mode="r+")
+
+        except Exception as e:
+
+            print(f"Error loading embedding store {self.root}: {e}")
+            return
+
+        if self.dim is not None and vectors.shape[1] != self.dim:
+            print(f"Embedding store {self.root} has dim {vectors.shape[1]}, ignoring")
+            return
+
+        self.vectors = vectors
+        self.generation = generation
+        self.dim = vectors.shape[1]
+        self.dtype = vectors.dtype
+        self.rows = int(index.get("rows", 0))
+        self.ids = index.get("ids", {}) or {}
+
+    def __len__(self) -> int:
+
+        return len(self.ids)
+
+    def __contains__(self, article_id: str) -> bool:
+
+        return article_id in self.ids
+
+    def tag(self, article_id: str) -> Optional[str]:
+
+        entry = self.ids.get(article_id)
+        return entry[1] if entry else None
+
+    def matrix(self) -> np.ndarray:
+
+        # zero-copy view of every written row, live or dead
+        if self.vectors is None:
+            return np.empty((0, self.dim or 0), dtype=self.dtype)
+
+        return self.vectors[: self.rows]
+
+    def get(self, article_ids: Iterable[str]) -> np.ndarray:
+
+        rows = [self.ids[i][0] for i in article_ids]
+
+        if not rows:
+            return np.empty((0, self.dim or 0), dtype=self.dtype)
+
+        return np.asarray(self.vectors[rows], dtype=np.float32)
+
+    def allocate(self, capacity: int, source: np.ndarray) -> None:
+
+        # a new generation holding source in its first rows; the caller saves
+        # the index that switches to it
+        self.root.mkdir(parents=True, exist_ok=True)
+        generation = self.generation + 1
+        path = self.vectors_file(generation)
+
+        grown = np.lib.format.open_memmap(
+            path, mode="w+", dtype=self.dtype, shape=(capacity, self.dim)
+        )
+        grown[: len(source)] = source
+        grown.flush()
+
+        self.vectors = grown
+        self.generation = generation
+
+    def put(
+        self,
+        article_ids: List[str],
+        vectors: np.ndarray,
+        tags: Optional[List[str]] = None,
+    ) -> None:
+
+        if not article_ids:
+            return
+
+        vectors = np.asarray(vectors)
+
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+
+        needed = self.rows + len(article_ids)
+        capacity = 0 if self.vectors is None else self.vectors.shape[0]
+
+        if needed > capacity:
+            self.allocate(max(needed, capacity * 2, 1024), self.matrix())
+
+        # always append; rows of replaced ids become dead until compact()
+        start = self.rows
+        self.vectors[start:needed] = vectors.astype(self.dtype, copy=False)
+        self.vectors.flush()
+
+        tags = tags or [""] * len(article_ids)
+
+        for offset, (article_id, tag) in enumerate(zip(article_ids, tags)):
+
+            self.ids[article_id] = [start + offset, tag]
+
+        self.rows = needed
+        self.save_index()
+
+    def delete(self, article_ids: Iterable[str]) -> int:
+
+        removed = 0
+
+        for article_id in article_ids:
+
+            if self.ids.pop(article_id, None) is not None:
+                removed += 1
+
+        if removed:
+            self.save_index()
+
+        return removed
+
+    def dead_rows(self) -> int:
+
+        return self.rows - len(self.ids)
+
+    def compact(self) -> None:
+
+        # rewrites the matrix with live rows only, in their current order
+        if self.vectors is None or not self.dead_rows():
+            return
+
+        live = sorted(self.ids.items(), key=lambda item: item[1][0])
+        kept = self.vectors[[entry[0] for _, entry in live]]
+
+        self.allocate(max(len(live), 1024), kept)
+        self.ids = {i: [row, entry[1]] for row, (i, entry) in enumerate(live)}
+        self.rows = len(live)
+        self.save_index()
+
+    def save_index(self) -> None:
+
+        # written after the vectors are flushed, so it never points past them
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_file.with_suffix(".tmp")
+
+        with open(tmp, "w", encoding="utf-8") as f:
+
+            json.dump(
+                {
+                    "generation": self.generation,
+                    "dim": self.dim,
+                    "dtype": self.dtype.name,
+                    "rows": self.rows,
+                    "ids": self.ids,
+                },
+                f,
+            )
+
+        os.replace(tmp, self.index_file)
+
+        # older generations are unreachable once the index names this one
+        for path in self.root.glob("vectors-*.npy"):
+
+            if path != self.vectors_file(self.generation):
+                path.unlink(missing_ok=True)
+
+    def close(self) -> None:
+
+        if self.vectors is not None:
+            self.vectors.flush()
+            self.vectors = None
@@ -0,0 +1,261 @@
+import json
+import os
+import re
+import hashlib
+import datetime as dt
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+DB_DIR = Path(__file__).parent.parent.parent / "data" / "db"
+NEARDUP_FILE = DB_DIR / "neardup.json"
+
+BITS = 64
+WORD_RE = re.compile(r"\w+")
+SHINGLE = 3
+
+# odd multipliers for combining word hashes into shingle hashes (uint64 wraps)
+K1 = np.uint64(0x9E3779B97F4A7C15)
+K2 = np.uint64(0xC2B2AE3D27D4EB4F)
+K3 = np.uint64(0x165667B19E3779F9)
+BIT_SHIFTS = np.arange(BITS, dtype=np.uint64)
+
+
+def word_hash(word: str) -> int:
+
+    return int.from_bytes(
+        hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest(), "little"
+    )
+
+
+def mix(h):
+
+    # splitmix64 finalizer, spreads the combined word hashes over all 64 bits
+    h = h ^ (h >> np.uint64(30))
+    h = h * np.uint64(0xBF58476D1CE4E5B9)
+    h = h ^ (h >> np.uint64(27))
+    h = h * np.uint64(0x94D049BB133111EB)
+    return h ^ (h >> np.uint64(31))
+
+
+def simhash(text: str) -> Optional[int]:
+
+    # 64-bit SimHash over lowercase word 3-shingles; None for texts too short
+    words = WORD_RE.findall((text or "").lower())
+
+    if len(words) < SHINGLE + 2:
+        return None
+
+    hashes = {w: word_hash(w) for w in set(words)}
+    h = np.fromiter((hashes[w] for w in words), dtype=np.uint64, count=len(words))
+
+    with np.errstate(over="ignore"):
+        shingles = mix(h[:-2] * K1 + h[1:-1] * K2 + h[2:] * K3)
+
+    ones = ((shingles[:, None] >> BIT_SHIFTS) & np.uint64(1)).sum(axis=0)
+    bits = ones * 2 > len(shingles)
+
+    return int(np.packbits(bits[::-1]).view(">u8")[0])
+
+
+class neardup_index:
+
+    # SimHash signatures of recently indexed articles, bucketed by LSH bands.
+    # with max_distance + 1 bands any pair within max_distance differing bits
+    # shares at least one band, so only bucket mates are compared exactly.
+    # collapsed copies are kept as alternates of the article that was indexed
+    # first, so the story can still list every url
+
+    def __init__(
+        self, path: Path = NEARDUP_FILE, max_distance: int = 3, keep_days: int = 30
+    ):
+
+        self.path = Path(path)
+        self.max_distance = max_distance
+        self.keep_days = keep_days
+        self.bands = max_distance + 1
+        self.width = BITS // self.bands
+        self.mask = (1 << self.width) - 1
+
+        # id -> [signature, timestamp]
+        self.signatures: Dict[str, List[Any]] = {}
+        self.buckets: Dict[tuple, List[str]] = {}
+        self.alternates: Dict[str, List[Dict[str, str]]] = {}
+        self.collapsed = 0
+        self.dirty = False
+        self.load()
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]] = None):
+
+        config = config or {}
+
+        return cls(
+            max_distance=int(config.get("max_distance", 3)),
+            keep_days=int(config.get("keep_days", 30)),
+        )
+
+    def load(self) -> None:
+
+        try:
+
+            if self.path.exists():
+
+                with open(self.path, "r", encoding="utf-8") as f:
+
+                    data = json.load(f) or {}
+
+                for article_id, (sig, ts) in data.get("signatures", {}).items():
+
+                    self.insert(article_id, int(sig, 16), ts)
+
+                self.alternates = data.get("alternates", {}) or {}
+
+        except Exception as e:
+
+            print(f"Error loading near-duplicate index {self.path}: {e}")
+
+    def band_keys(self, sig: int):
+
+        return [
+            (band, (sig >> (band * self.width)) & self.mask)
+            for band in range(self.bands)
+        ]
+
+    def insert(self, article_id: str, sig: int, ts: str = "") -> None:
+
+        self.signatures[article_id] = [sig, ts]
+
+        for key in self.band_keys(sig):
+
+            self.buckets.setdefault(key, []).append(article_id)
+
+    def match(self, sig: int) -> Optional[str]:
+
+        best = None
+        best_distance = self.max_distance + 1
+
+        for key in self.band_keys(sig):
+
+            for other in self.buckets.get(key, ()):
+
+                distance = (sig ^ self.signatures[other][0]).bit_count()
+
+                if distance < best_distance:
+                    best, best_distance = other, distance
+
+        return best
+
+    def collapse(self, article: Dict[str, Any]) -> Optional[str]:
+
+        # the id this article duplicates (recording it as an alternate), or
+        # None after indexing it as a new original
+        if article["id"] in self.signatures:
+            # the same article seen twice, not a copy of another one
+            return article["id"]
+
+        sig = simhash(article.get("text", ""))
+
+        if sig is None:
+            return None
+
+        original = self.match(sig)
+
+        if original is None:
+
+            self.insert(article["id"], sig, article.get("timestamp", ""))
+            self.dirty = True
+            return None
+
+        self.alternates.setdefault(original, []).append(
+            {
+                "id": article["id"],
+                "url": article.get("url", ""),
+                "source": article.get("source", ""),
+            }
+        )
+        self.collapsed += 1
+        self.dirty = True
+
+        return original
+
+    def prune(self) -> None:
+
+        # old signatures stop being matched, and their originals' alternates go
+        # with them, so the file only covers the last keep_days of articles
+        cutoff = dt.datetime.now(dt.timezone.utc) - dt.timedelta(days=self.keep_days)
+        cutoff = cutoff.isoformat()
+
+        old = [i for i, (_, ts) in self.signatures.items() if ts and ts < cutoff]
+
+        for article_id in old:
+
+            del self.signatures[article_id]
+
+        # files written before alternates were pruned can hold orphans too
+        orphans = [i for i in self.alternates if i not in self.signatures]
+
+        for article_id in orphans:
+
+            del self.alternates[article_id]
+
+        if not old and not orphans:
+            return
+
+        if old:
+
+            self.buckets = {}
+
+            for article_id, (sig, ts) in list(self.signatures.items()):
+
+                self.insert(article_id, sig, ts)
+
+        self.dirty = True
+
+    def save(self) -> None:
+
+        self.prune()
+
+        if not self.dirty:
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+
+        with open(tmp, "w", encoding="utf-8") as f:
+
+            json.dump(
+                {
+                    "max_distance": self.max_distance,
+                    "signatures": {
+                        i: [f"{sig:016x}", ts]
+                        for i, (sig, ts) in self.signatures.items()
+                    },
+                    "alternates": self.alternates,
+                },
+                f,
+                ensure_ascii=False,
+            )
+
+        os.replace(tmp, self.path)
+        self.dirty = False
+
+
+def load_alternates(path: Path = NEARDUP_FILE) -> Dict[str, List[Dict[str, str]]]:
+
+    # read-only view for later stages (build.py) that only need the alternates
+    try:
+
+        with open(path, "r", encoding="utf-8") as f:
+
+            return (json.load(f) or {}).get("alternates", {}) or {}
+
+    except FileNotFoundError:
+
+        return {}
+
+    except Exception as e:
+
+        print(f"Error loading near-duplicate alternates {path}: {e}")
+        return {}
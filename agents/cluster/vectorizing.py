@@ -1,21 +1,48 @@
 from sklearn.feature_extraction.text import TfidfVectorizer
 from pathlib import Path
-import json
 import os
 import pandas as pd
 import numpy as np
 from sentence_transformers import SentenceTransformer
 import re
+import hashlib
+import importlib.util
 import processing
+import embedding_store
+
+LIB_DIR = Path(__file__).parent.parent.parent / "data" / "agents"
+
+spec_store = importlib.util.spec_from_file_location(
+    "storage", LIB_DIR / "storage.py"
+)
+storage = importlib.util.module_from_spec(spec_store)
+spec_store.loader.exec_module(storage)
+
+MODEL_NAME = "all-MiniLM-L6-v2"
 
 
 class vectorizer:
 
-    def __init__(self):
+    def __init__(self, embedding_dtype="float32"):
+
+        self._model = None
+        self.model_name = MODEL_NAME
 
-        self.model = SentenceTransformer("all-MiniLM-L6-v2")
+        # persisted embeddings (float32, or float16 for half the disk and RAM)
+        self.embeddings = embedding_store.embedding_store(
+            embedding_store.model_dir(MODEL_NAME), dtype=embedding_dtype
+        )
         self.vectorizer = TfidfVectorizer(max_features=5000, stop_words="english")
 
+    @property
+    def model(self):
+
+        # loaded on first use; a run where every embedding is cached never loads it
+        if self._model is None:
+            self._model = SentenceTransformer(self.model_name)
+
+        return self._model
+
     def get_all_files_in_directory(self, directory: Path, extension: str):
 
         file_paths = []
@@ -48,28 +75,12 @@ class vectorizer:
         self.index_file = self.root_db_path / self.index
         self.articales_dir = self.root_db_path / self.structure
 
-        # load all articles from the db
-
-        all_articales = []
-        all_files = self.get_all_files_in_directory(
-            self.articales_dir, extension=self.format
-        )
-
-        for file_path in all_files:
-
-            with open(file_path, "r", encoding="utf-8") as f:
-
-                try:
-
-                    data = json.load(f)
-
-                    for artacle in data:
+        # load all articles from the db; .jsonl partitions are parsed a line
+        # at a time, legacy .json arrays are still read whole
 
-                        all_articales.append(artacle)
-
-                except Exception as e:
-
-                    print(f"Error loading {file_path}: {e}")
+        store = storage.open_storage(self.root_db_path)
+        all_articales = list(store.iter_articles())
+        store.close()
 
         self.articales = all_articales
 
@@ -80,14 +91,20 @@ class vectorizer:
             articles = self.articales
 
         texts = {}
+        version = processing.cleaner_version()
 
         for article in articles:
 
             title = article.get("title", "")
 
             text = article.get("text", "")
-            processer = processing.TextProcessor(text)
-            clean_text = processer.clean_text()
+
+            # the clean stage already ran TextProcessor over stamped articles
+            if article.get("clean_version") == version:
+                clean_text = text
+            else:
+                processer = processing.TextProcessor(text)
+                clean_text = processer.clean_text()
 
             id = article.get("id", "")
 
@@ -126,12 +143,43 @@ class vectorizer:
             embeddings_by_id = {}
             return X, embeddings_by_id
 
-        X = self.model.encode(sentences, normalize_embeddings=True)
+        X = self.cached_embeddings(ids, texts_by_id)
 
         embeddings_by_id = {i: X[idx] for idx, i in enumerate(ids)}
 
         return X, embeddings_by_id
 
+    def text_key(self, text):
+
+        # the cache key stored as the row tag: model name + prepared text
+        return hashlib.sha1(f"{self.model_name}\n{text}".encode("utf-8")).hexdigest()
+
+    def cached_embeddings(self, ids, texts_by_id):
+
+        # only articles that are new, or whose prepared text changed, are
+        # encoded; the matrix is assembled from data/db/embeddings
+        store = self.embeddings
+        keys = {i: self.text_key(texts_by_id[i]) for i in ids}
+        misses = [i for i in ids if store.tag(i) != keys[i]]
+
+        print(f"Embeddings: {len(ids) - len(misses)} cached, {len(misses)} to encode")
+
+        if misses:
+
+            encoded = self.model.encode(
+                [texts_by_id[i] for i in misses], normalize_embeddings=True
+            )
+            store.put(misses, encoded, [keys[i] for i in misses])
+
+        # articles no longer loaded have aged out of the cache
+        current = set(ids)
+        store.delete([i for i in list(store.ids) if i not in current])
+
+        if store.dead_rows() > len(store):
+            store.compact()
+
+        return store.get(ids)
+
 
 if __name__ == "__main__":
 
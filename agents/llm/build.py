@@ -9,6 +9,8 @@ DB_DIR = Path(__file__).parent.parent.parent / "data" / "db"
 CAN_FILE = DB_DIR / "story_candidates.json"
 STORY_FILE = DB_DIR / "stories.json"
 
+storage = llm.load_lib("storage")
+
 
 class LLMProcessor:
 
@@ -18,6 +20,7 @@ class LLMProcessor:
         self.db_dir = DB_DIR
         self.can_file = CAN_FILE
         self.story_file = STORY_FILE
+        self.store = storage.open_storage(self.db_dir)
         self.weights = {"llms": 0.6, "reliability": 0.2, "recency": 0.2}
         self.reliability_scores = {
             "NASA": 0.99,
@@ -39,13 +42,11 @@ class LLMProcessor:
 
     def load_candidates(self, return_type="none"):
 
-        if not self.can_file.exists():
-
-            raise FileNotFoundError(f"Candidate file not found: {self.can_file}")
+        self.candidates = self.store.load_candidates()
 
-        with open(self.can_file, "r", encoding="utf-8") as f:
+        if self.candidates is None:
 
-            self.candidates = json.load(f)
+            raise FileNotFoundError(f"Candidate file not found: {self.can_file}")
 
         if return_type != "none":
 
@@ -57,13 +58,7 @@ class LLMProcessor:
 
     def load_stories(self):
 
-        if not self.story_file.exists():
-
-            return []
-
-        with open(self.story_file, "r", encoding="utf-8") as f:
-
-            self.stories = json.load(f)
+        self.stories = self.store.load_stories()
 
         return self.stories
 
@@ -188,15 +183,17 @@ class LLMProcessor:
 
         self.processed_stories = processed_stories
 
-        with open(self.story_file, "w", encoding="utf-8") as f:
-
-            json.dump(self.processed_stories, f, indent=4, ensure_ascii=False)
+        self.store.save_stories(self.processed_stories)
 
         print(f"\nProcessing Summary:")
         print(f"✓ Successfully processed: {successful_count}")
         print(f"✗ Failed to process: {failed_count}")
         print(f"📊 Total stories saved: {len(self.processed_stories)}")
 
+    def close(self):
+
+        self.store.close()
+
     def calculate_recency_score(self, candidate):
 
         ts_str = candidate.get("timestamp", "")
@@ -214,5 +211,10 @@ class LLMProcessor:
 if __name__ == "__main__":
     print("Starting LLM processing of story candidates...")
     processor = LLMProcessor(api_key="use_local")
-    processor.process_candidates()
+
+    try:
+        processor.process_candidates()
+    finally:
+        processor.close()
+
     print("LLM processing completed. Stories saved to:", processor.story_file)
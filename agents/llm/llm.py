@@ -1,4 +1,5 @@
 from pathlib import Path
+import importlib.util
 import requests
 from dotenv import load_dotenv
 import os
@@ -8,6 +9,32 @@ RULES_DIR = AGENT_DIR / "rules"
 ROOT_DIR = AGENT_DIR.parent
 DATA_DIR = ROOT_DIR / "data"
 DB_DIR = DATA_DIR / "db"
+LIB_DIR = DATA_DIR / "agents"
+
+
+def load_lib(name: str):
+
+    spec = importlib.util.spec_from_file_location(name, LIB_DIR / f"{name}.py")
+    lib = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(lib)
+    return lib
+
+
+http_session = load_lib("http_session")
+from_yml = load_lib("from_yml")
+
+
+def request_config() -> dict:
+
+    try:
+
+        defaults = from_yml.load_feeds().get("defaults", {}) or {}
+        return defaults.get("request", {}) or {}
+
+    except Exception as e:
+
+        print(f"Could not read request defaults from feeds config: {e}")
+        return {}
 
 
 class get_rules:
@@ -44,6 +71,7 @@ class LLMClient:
         self.api_key = api_key
         self.api_url = "https://ai.hackclub.com/proxy/v1/chat/completions"
         self.model = "openai/gpt-5-mini"
+        self.session = http_session.get_session(request_config())
 
     def load_rules(self):
 
@@ -95,7 +123,7 @@ class LLMClient:
         for attempt in range(max_retries):
             try:
                 timeout = 60 if attempt == 0 else 90  # Increase timeout on retry
-                r = requests.post(
+                r = self.session.post(
                     url=self.api_url, json=data, headers=headers, timeout=timeout
                 )
 
@@ -2,16 +2,36 @@ import flask
 from flask import Flask, jsonify, request, render_template
 import data_pipeline
 import os
-import json
+import importlib.util
 from datetime import datetime
+from pathlib import Path
 
 app = Flask(__name__)
 
+spec = importlib.util.spec_from_file_location(
+    "storage", Path(__file__).parent / "data" / "agents" / "storage.py"
+)
+storage = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(storage)
+
+_store = None
+
+
+def get_store():
+
+    # opened on the first request, then shared (json files or sqlite)
+    global _store
+
+    if _store is None:
+        _store = storage.open_storage()
+
+    return _store
+
 
 def load_stories():
     try:
-        with open("data/db/stories.json", "r", encoding="utf-8") as f:
-            stories = json.load(f)
+        # the 25 best ranked stories, highest first
+        stories = get_store().top_stories(25)
 
         cleaned_stories = []
         for story in stories:
@@ -40,15 +60,7 @@ def load_stories():
 
             cleaned_stories.append(cleaned_story)
 
-        # Sort by score
-        cleaned_stories.sort(
-            key=lambda x: -x.get("score_components", {}).get(
-                "llm_score", x.get("score", 0)
-            ),
-            reverse=False,
-        )
-
-        return cleaned_stories[:25]  # Show 25 stories instead of 10
+        return cleaned_stories
 
     except FileNotFoundError:
         print("Story candidates file not found")
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+
+# compares the stdlib fast path (data/agents/fastfeed.py) against feedparser on
+# the feeds stored in data/db/archive. run a live ingest first to fill it:
+#
+#   python benchmarks/feed_parse.py [--repeat 20] [extra.xml ...]
+
+import sys
+import time
+import importlib.util
+from pathlib import Path
+
+import feedparser
+
+ROOT_DIR = Path(__file__).parent.parent
+LIB_DIR = ROOT_DIR / "data" / "agents"
+
+
+def load_lib(name: str):
+
+    spec = importlib.util.spec_from_file_location(name, LIB_DIR / f"{name}.py")
+    lib = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(lib)
+    return lib
+
+
+archive = load_lib("archive")
+fastfeed = load_lib("fastfeed")
+
+
+def archived_feeds():
+
+    store = archive.raw_archive()
+
+    for url, record in sorted(store.latest.items()):
+
+        if record.get("kind") != "feed":
+            continue
+
+        r = store.get(url)
+
+        if r is not None:
+            yield url, r.content
+
+
+def best_of(fn, repeat: int) -> float:
+
+    best = float("inf")
+
+    for _ in range(repeat):
+
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+def agree(fast, slow) -> str:
+
+    keys = ("link", "title")
+    same = sum(
+        1
+        for a, b in zip(fast, slow)
+        if all((a.get(k) or "").strip() == (b.get(k) or "").strip() for k in keys)
+    )
+
+    return f"{same}/{len(slow)}"
+
+
+def main(argv):
+
+    repeat = 20
+
+    if "--repeat" in argv:
+        repeat = int(argv[argv.index("--repeat") + 1])
+
+    feeds = list(archived_feeds())
+
+    for path in argv:
+
+        if path.endswith(".xml") or path.endswith(".rss"):
+            feeds.append((path, Path(path).read_bytes()))
+
+    if not feeds:
+        print("No archived feeds found; run the clean stage once with archiving on.")
+        return 1
+
+    total_fast = 0.0
+    total_slow = 0.0
+
+    print(f"{'feed':60} {'KB':>7} {'fast ms':>9} {'feedparser ms':>14} {'same':>7}")
+
+    for url, body in feeds:
+
+        slow_entries = feedparser.parse(body).entries
+        fast_entries = fastfeed.parse(body)
+
+        slow = best_of(lambda: feedparser.parse(body), repeat)
+
+        if fast_entries is None:
+
+            # falls back, so the real cost is a failed fast attempt plus feedparser
+            fast = best_of(lambda: fastfeed.parse(body), repeat) + slow
+            same = "fallbk"
+
+        else:
+
+            fast = best_of(lambda: fastfeed.parse(body), repeat)
+            same = agree(fast_entries, slow_entries)
+
+        total_fast += fast
+        total_slow += slow
+
+        print(
+            f"{url[:60]:60} {len(body) / 1024:7.1f} {fast * 1000:9.2f} "
+            f"{slow * 1000:14.2f} {same:>7}"
+        )
+
+    print(
+        f"\nTotal: fast path {total_fast * 1000:.1f} ms, feedparser "
+        f"{total_slow * 1000:.1f} ms ({total_slow / max(total_fast, 1e-9):.1f}x)"
+    )
+
+    return 0
+
+
+if __name__ == "__main__":
+
+    sys.exit(main(sys.argv[1:]))
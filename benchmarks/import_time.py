@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+
+# cold-start cost of the pipeline stages and the Flask app. every sample is a
+# fresh interpreter, so nothing is served from an already warm sys.modules:
+#
+#   python benchmarks/import_time.py [--repeat 5] [--detail clean]
+
+import sys
+import subprocess
+import statistics
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+
+# name -> (directory put on sys.path / cwd, module file)
+TARGETS = {
+    "interpreter": (ROOT_DIR, None),
+    "from_yml": (ROOT_DIR / "data" / "agents", "from_yml.py"),
+    "process_yml": (ROOT_DIR / "data" / "agents", "process_yml.py"),
+    "fetch": (ROOT_DIR / "data" / "agents", "fetch.py"),
+    "processing": (ROOT_DIR / "agents" / "cluster", "processing.py"),
+    "clean": (ROOT_DIR / "agents" / "cluster", "clean.py"),
+    "app": (ROOT_DIR, "app.py"),
+}
+
+TIMER = """
+import sys, time, importlib.util
+start = time.perf_counter()
+if {file!r}:
+    sys.path.insert(0, {cwd!r})
+    spec = importlib.util.spec_from_file_location({name!r}, {path!r})
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[{name!r}] = module
+    spec.loader.exec_module(module)
+print(time.perf_counter() - start)
+"""
+
+
+def script(name: str) -> str:
+
+    cwd, file = TARGETS[name]
+    path = str(cwd / file) if file else ""
+
+    return TIMER.format(file=file, cwd=str(cwd), name=name, path=path)
+
+
+def sample(name: str) -> float:
+
+    cwd, _ = TARGETS[name]
+    result = subprocess.run(
+        [sys.executable, "-c", script(name)],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def detail(name: str, top: int = 15) -> None:
+
+    # heaviest imports by cumulative time, from python -X importtime
+    cwd, _ = TARGETS[name]
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script(name)],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    rows = []
+
+    for line in result.stderr.splitlines():
+
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+
+        # "import time:  self_us | cumulative_us | module"
+        own, cumulative, module = line[len("import time:") :].split("|", 2)
+        rows.append((int(cumulative), int(own), module))
+
+    print(f"\nTop {top} imports for {name} (cumulative ms):")
+
+    for cumulative, own, module in sorted(rows, reverse=True)[:top]:
+
+        print(f"  {cumulative / 1000:8.1f} {own / 1000:8.1f}  {module.strip()}")
+
+
+def main(argv):
+
+    repeat = 5
+
+    if "--repeat" in argv:
+        repeat = int(argv[argv.index("--repeat") + 1])
+
+    print(f"{'target':14} {'best ms':>9} {'median ms':>10}")
+
+    for name in TARGETS:
+
+        try:
+            times = [sample(name) for _ in range(repeat)]
+        except subprocess.CalledProcessError as e:
+            print(f"{name:14} failed: {e.stderr.strip().splitlines()[-1:]}")
+            continue
+
+        print(
+            f"{name:14} {min(times) * 1000:9.1f} "
+            f"{statistics.median(times) * 1000:10.1f}"
+        )
+
+    if "--detail" in argv:
+        detail(argv[argv.index("--detail") + 1])
+
+    return 0
+
+
+if __name__ == "__main__":
+
+    sys.exit(main(sys.argv[1:]))
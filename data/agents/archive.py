@@ -0,0 +1,165 @@
+import gzip
+import json
+import os
+import hashlib
+import threading
+import datetime as dt
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+DB_DIR = Path(__file__).parent.parent / "db"
+ARCHIVE_DIR = DB_DIR / "archive"
+
+
+class replayed_response:
+
+    # the parts of requests.Response that fetcher reads, served from the archive
+
+    def __init__(self, url: str, body: bytes, content_type: str = ""):
+
+        self.url = url
+        self.content = body
+        self.headers = {"Content-Type": content_type} if content_type else {}
+        self.status_code = 200
+
+    @property
+    def encoding(self) -> Optional[str]:
+
+        content_type = self.headers.get("Content-Type", "")
+
+        if "charset=" in content_type:
+            return content_type.split("charset=", 1)[1].split(";")[0].strip()
+
+        return None
+
+    @property
+    def text(self) -> str:
+
+        try:
+            return self.content.decode(self.encoding or "utf-8", errors="replace")
+        except LookupError:
+            return self.content.decode("utf-8", errors="replace")
+
+    def iter_content(self, chunk_size: int = 16384):
+
+        for i in range(0, len(self.content), chunk_size):
+
+            yield self.content[i : i + chunk_size]
+
+    def raise_for_status(self) -> None:
+
+        return None
+
+    def close(self) -> None:
+
+        return None
+
+
+class raw_archive:
+
+    # gzip objects named by the sha256 of the body, plus an append-only
+    # manifest recording which body each url returned and when
+
+    def __init__(self, root: Path = ARCHIVE_DIR):
+
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.manifest_file = self.root / "manifest.jsonl"
+        self.lock = threading.Lock()
+        self.latest: Dict[str, Dict[str, Any]] = self.load_manifest()
+
+    def load_manifest(self) -> Dict[str, Dict[str, Any]]:
+
+        latest = {}
+
+        if not self.manifest_file.exists():
+            return latest
+
+        with open(self.manifest_file, "r", encoding="utf-8") as f:
+
+            for line in f:
+
+                line = line.strip()
+
+                if not line:
+                    continue
+
+                try:
+                    record = json.loads(line)
+                except Exception:
+                    # a torn last line from an interrupted run
+                    continue
+
+                latest[record.get("url", "")] = record
+
+        return latest
+
+    def object_path(self, digest: str) -> Path:
+
+        return self.objects_dir / digest[:2] / f"{digest}.gz"
+
+    def put(
+        self, url: str, body: bytes, content_type: str = "", kind: str = "page"
+    ) -> str:
+
+        digest = hashlib.sha256(body or b"").hexdigest()
+        path = self.object_path(digest)
+
+        if not path.exists():
+
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+
+            with gzip.open(tmp, "wb") as f:
+
+                f.write(body or b"")
+
+            os.replace(tmp, path)
+
+        with self.lock:
+
+            if self.latest.get(url, {}).get("sha256") == digest:
+                return digest
+
+            record = {
+                "url": url,
+                "sha256": digest,
+                "kind": kind,
+                "content_type": content_type,
+                "fetched_at": dt.datetime.now(dt.timezone.utc).isoformat(),
+            }
+
+            self.root.mkdir(parents=True, exist_ok=True)
+
+            with open(self.manifest_file, "a", encoding="utf-8") as f:
+
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+            self.latest[url] = record
+
+        return digest
+
+    def get(self, url: str) -> Optional[replayed_response]:
+
+        with self.lock:
+            record = self.latest.get(url)
+
+        if not record:
+            return None
+
+        path = self.object_path(record["sha256"])
+
+        if not path.exists():
+            return None
+
+        with gzip.open(path, "rb") as f:
+
+            body = f.read()
+
+        return replayed_response(url, body, record.get("content_type", ""))
+
+    def has(self, url: str) -> bool:
+
+        with self.lock:
+
+            return url in self.latest
@@ -0,0 +1,116 @@
+import time
+import threading
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class circuit_breaker:
+
+    # stops calling a host after repeated timeouts / connection errors; once
+    # reset_after_sec has passed a single probe request is let through and its
+    # outcome decides whether the host is closed again or stays open
+
+    def __init__(self, failure_threshold: int = 3, reset_after_sec: float = 60.0):
+
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_after_sec = float(reset_after_sec)
+        self.hosts: Dict[str, Dict[str, Any]] = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> "circuit_breaker":
+
+        cfg = (config or {}).get("breaker", {}) or {}
+
+        return cls(
+            failure_threshold=cfg.get("failure_threshold", 3),
+            reset_after_sec=cfg.get("reset_after_sec", 60),
+        )
+
+    def host_of(self, url: str) -> str:
+
+        try:
+            return urlparse(url).netloc.lower()
+        except Exception:
+            return ""
+
+    def entry(self, host: str) -> Dict[str, Any]:
+
+        return self.hosts.setdefault(
+            host, {"state": CLOSED, "failures": 0, "opened_at": 0.0, "probing": False}
+        )
+
+    def allow(self, url: str) -> bool:
+
+        host = self.host_of(url)
+
+        with self.lock:
+
+            e = self.entry(host)
+
+            if e["state"] == CLOSED:
+                return True
+
+            if e["state"] == OPEN:
+
+                if time.monotonic() - e["opened_at"] < self.reset_after_sec:
+                    return False
+
+                e["state"] = HALF_OPEN
+                e["probing"] = False
+
+            # half open: exactly one request probes the host
+            if e["probing"]:
+                return False
+
+            e["probing"] = True
+            return True
+
+    def record_success(self, url: str) -> None:
+
+        host = self.host_of(url)
+
+        with self.lock:
+
+            e = self.entry(host)
+
+            if e["state"] != CLOSED:
+                print(f"Circuit closed for {host}")
+
+            e.update(state=CLOSED, failures=0, probing=False)
+
+    def record_failure(self, url: str) -> None:
+
+        host = self.host_of(url)
+
+        with self.lock:
+
+            e = self.entry(host)
+            e["failures"] += 1
+            e["probing"] = False
+
+            if e["state"] == HALF_OPEN or e["failures"] >= self.failure_threshold:
+
+                if e["state"] != OPEN:
+                    print(f"Circuit open for {host} after {e['failures']} failures")
+
+                e["state"] = OPEN
+                e["opened_at"] = time.monotonic()
+
+    def release(self, url: str) -> None:
+
+        # the probe ended without an outcome for the host (an error on our side),
+        # so the next request may probe it again
+        with self.lock:
+
+            self.entry(self.host_of(url))["probing"] = False
+
+    def is_open(self, url: str) -> bool:
+
+        with self.lock:
+
+            return self.entry(self.host_of(url))["state"] == OPEN
@@ -0,0 +1,29 @@
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+
+TRACKING_PARAMS = {
+    "utm_source",
+    "utm_medium",
+    "utm_campaign",
+    "utm_term",
+    "utm_content",
+    "fbclid",
+    "gclid",
+}
+
+
+def canonical_url(url: str) -> str:
+
+    if not url:
+        return ""
+    try:
+        p = urlparse(url)
+        qs = [
+            (k, v)
+            for k, v in parse_qsl(p.query, keep_blank_values=True)
+            if k.lower() not in TRACKING_PARAMS
+        ]
+        p = p._replace(query=urlencode(qs, doseq=True), fragment="")
+        p = p._replace(netloc=p.netloc.lower())
+        return urlunparse(p)
+    except Exception:
+        return url
@@ -0,0 +1,77 @@
+import soupsieve as sv
+from bs4 import BeautifulSoup
+from typing import Any, Dict, Optional
+
+MAX_CHARS = 10000
+
+
+class extractor:
+
+    # per-source CSS selectors from feeds,yml, compiled once per run
+
+    def __init__(self, selectors: Optional[Dict[str, Dict[str, str]]] = None):
+
+        self.rules: Dict[str, Dict[str, Any]] = {}
+
+        for source, rule in (selectors or {}).items():
+
+            compiled = self.compile_rule(source, rule or {})
+
+            if compiled:
+
+                self.rules[source] = compiled
+
+    def compile_rule(self, source: str, rule: Dict[str, str]) -> Dict[str, Any]:
+
+        compiled = {}
+
+        for key in ("article", "content"):
+
+            pattern = rule.get(key)
+
+            if not pattern:
+                continue
+
+            try:
+                compiled[key] = sv.compile(pattern)
+            except Exception as e:
+                print(f"Invalid {key} selector for {source}: {pattern!r} ({e})")
+
+        return compiled
+
+    def targeted(self, soup: BeautifulSoup, rule: Dict[str, Any]) -> str:
+
+        if "content" in rule:
+
+            parts = rule["content"].select(soup)
+
+        elif "article" in rule:
+
+            parts = rule["article"].select(soup)[:1]
+
+        else:
+
+            return ""
+
+        return " ".join(p.get_text(" ", strip=True) for p in parts).strip()
+
+    def generic(self, soup: BeautifulSoup) -> str:
+
+        return " ".join(p.get_text(" ", strip=True) for p in soup.find_all("p"))
+
+    def extract(
+        self, html: str, source: Optional[str] = None, max_chars: int = MAX_CHARS
+    ) -> str:
+
+        soup = BeautifulSoup(html, "html.parser")
+        rule = self.rules.get(source or "")
+
+        if rule:
+
+            text = self.targeted(soup, rule)
+
+            if text:
+                return text[:max_chars]
+
+        # no selector for this source, or the page layout changed
+        return self.generic(soup)[:max_chars]
@@ -0,0 +1,134 @@
+import io
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, List, Optional
+
+# stdlib fast path for well-formed RSS 2.0 and Atom feeds. it only extracts the
+# fields fetcher.poll reads and returns None for anything it cannot handle, so
+# the caller can fall back to feedparser
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+CONTENT = "{http://purl.org/rss/1.0/modules/content/}"
+DC = "{http://purl.org/dc/elements/1.1/}"
+
+
+def text_of(el) -> str:
+
+    if el is None:
+        return ""
+
+    return "".join(el.itertext()).strip()
+
+
+def rss_entry(item) -> Dict[str, Any]:
+
+    published = text_of(item.find("pubDate")) or text_of(item.find(f"{DC}date"))
+    guid = item.find("guid")
+    link = text_of(item.find("link"))
+
+    # like feedparser, a permalink guid stands in for a missing <link>
+    if not link and guid is not None and guid.get("isPermaLink") != "false":
+        link = text_of(guid)
+
+    entry = {
+        "link": link,
+        "id": text_of(guid),
+        "title": text_of(item.find("title")),
+        "published": published,
+        "summary": text_of(item.find("description")),
+    }
+
+    encoded = item.find(f"{CONTENT}encoded")
+
+    if encoded is not None and text_of(encoded):
+        entry["content"] = [{"value": text_of(encoded)}]
+
+    return entry
+
+
+def atom_link(entry_el) -> str:
+
+    fallback = ""
+
+    for link in entry_el.findall(f"{ATOM}link"):
+
+        rel = link.get("rel", "alternate")
+        href = link.get("href", "")
+
+        if rel == "alternate" and href:
+            return href
+
+        fallback = fallback or href
+
+    return fallback
+
+
+def atom_entry(entry_el) -> Dict[str, Any]:
+
+    entry = {
+        "link": atom_link(entry_el),
+        "id": text_of(entry_el.find(f"{ATOM}id")),
+        "title": text_of(entry_el.find(f"{ATOM}title")),
+        "published": text_of(entry_el.find(f"{ATOM}published")),
+        "updated": text_of(entry_el.find(f"{ATOM}updated")),
+        "summary": text_of(entry_el.find(f"{ATOM}summary")),
+    }
+
+    content = entry_el.find(f"{ATOM}content")
+
+    if content is not None and text_of(content):
+        entry["content"] = [{"value": text_of(content)}]
+
+    return entry
+
+
+def parse(
+    body: bytes, max_items: Optional[int] = None
+) -> Optional[List[Dict[str, Any]]]:
+
+    if not body:
+        return None
+
+    entries: List[Dict[str, Any]] = []
+    kind = None
+
+    try:
+
+        for event, el in ET.iterparse(io.BytesIO(body), events=("start", "end")):
+
+            if kind is None:
+
+                if event != "start":
+                    continue
+
+                if el.tag == "rss" and el.get("version", "2.0").startswith("2"):
+                    kind = "rss"
+                elif el.tag == f"{ATOM}feed":
+                    kind = "atom"
+                else:
+                    # RSS 1.0 / RDF and anything unusual go to feedparser
+                    return None
+
+                continue
+
+            if event != "end":
+                continue
+
+            if kind == "rss" and el.tag == "item":
+                entries.append(rss_entry(el))
+                el.clear()
+            elif kind == "atom" and el.tag == f"{ATOM}entry":
+                entries.append(atom_entry(el))
+                el.clear()
+
+            if max_items is not None and len(entries) >= max_items:
+                break
+
+    except ET.ParseError:
+
+        # undeclared HTML entities, broken markup, wrong encoding declarations
+        return None
+
+    if kind is None:
+        return None
+
+    return entries
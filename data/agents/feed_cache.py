@@ -0,0 +1,112 @@
+import json
+import os
+import hashlib
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+DB_DIR = Path(__file__).parent.parent / "db"
+CACHE_FILE = DB_DIR / "feed_cache.json"
+
+
+class feed_cache:
+
+    # per-feed validators (ETag / Last-Modified) and body hash from the last poll
+
+    def __init__(self, path: Path = CACHE_FILE):
+
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        self.entries: Dict[str, Dict[str, Any]] = self.load()
+        self.dirty = False
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+
+        try:
+
+            if self.path.exists():
+
+                with open(self.path, "r", encoding="utf-8") as f:
+
+                    data = json.load(f) or {}
+
+                return data if isinstance(data, dict) else {}
+
+        except Exception as e:
+
+            print(f"Error loading feed cache {self.path}: {e}")
+
+        return {}
+
+    def body_hash(self, body: bytes) -> str:
+
+        return hashlib.sha256(body or b"").hexdigest()
+
+    def request_headers(self, feed_url: str) -> Dict[str, str]:
+
+        headers = {}
+
+        with self.lock:
+            entry = self.entries.get(feed_url, {})
+
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+        return headers
+
+    def is_unchanged(self, feed_url: str, body: bytes) -> bool:
+
+        with self.lock:
+            old = self.entries.get(feed_url, {}).get("hash")
+
+        return bool(old) and old == self.body_hash(body)
+
+    def update(
+        self,
+        feed_url: str,
+        body: Optional[bytes],
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+
+        with self.lock:
+
+            entry = self.entries.setdefault(feed_url, {})
+
+            if etag:
+                entry["etag"] = etag
+
+            if last_modified:
+                entry["last_modified"] = last_modified
+
+            if body is not None:
+                entry["hash"] = self.body_hash(body)
+
+            self.dirty = True
+
+    def forget(self, feed_url: str) -> None:
+
+        with self.lock:
+
+            if self.entries.pop(feed_url, None) is not None:
+                self.dirty = True
+
+    def save(self) -> None:
+
+        with self.lock:
+
+            if not self.dirty:
+                return
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+
+            with open(tmp, "w", encoding="utf-8") as f:
+
+                json.dump(self.entries, f, ensure_ascii=False, indent=2)
+
+            os.replace(tmp, self.path)
+            self.dirty = False
@@ -1,76 +1,456 @@
 import feedparser
 import requests
-from typing import List, Dict, Any
-from dateutil import parser as dtp
+import time
+import codecs
+import importlib.util
+from pathlib import Path
+from typing import List, Dict, Any, Tuple
 from bs4 import BeautifulSoup
 
+LIB_DIR = Path(__file__).parent
+
+
+def load_lib(name: str):
+
+    spec = importlib.util.spec_from_file_location(name, LIB_DIR / f"{name}.py")
+    lib = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(lib)
+    return lib
+
+
+pool = load_lib("pool")
+feed_cache = load_lib("feed_cache")
+known = load_lib("known")
+http_session = load_lib("http_session")
+extract = load_lib("extract")
+archive = load_lib("archive")
+breaker = load_lib("breaker")
+fastfeed = load_lib("fastfeed")
+canonical = load_lib("canonical")
+timeparse = load_lib("timeparse")
+stream_html = load_lib("stream_html")
+
+
+class feed_skipped(Exception):
+
+    pass
+
 
 class fetcher:
 
     def __init__(self):
         self.feed_urls = []
         self.feed_config = {}
+        self.pool = pool.fetch_pool()
+        self.cache = feed_cache.feed_cache()
+        self.known = known.known_index()
+        self.use_cache = True
+        self.session = http_session.get_session()
+        self.extractor = extract.extractor()
+        self.archive = archive.raw_archive()
+        self.archive_enabled = True
+        self.replay = False
+        self.breaker = breaker.circuit_breaker()
+        self.deadline = None
+        self.fast_path = True
+        self.max_page_bytes = 2_000_000
+        self.max_page_chars = 10000
+        self.duplicates = 0
 
     def timestamp_to_iso(self, ts: str) -> str:
-        try:
-            dt = dtp.parse(ts)
-            return dt.isoformat()
-        except Exception:
-            return ""
+
+        # normalized to UTC once here, so later stages only see ISO 8601
+        return timeparse.to_iso(ts)
 
     def set_urls(self, urls: List[str]) -> None:
         self.feed_urls = urls
 
     def set_config(self, feed_config: Dict[str, Any]) -> None:
         self.feed_config = feed_config
+        self.pool = pool.fetch_pool.from_config(feed_config)
+        self.use_cache = feed_config.get("request", {}).get("conditional", True)
+        self.session = http_session.get_session(feed_config.get("request", {}))
+        self.extractor = extract.extractor(feed_config.get("selectors", {}))
+        self.archive_enabled = feed_config.get("archive", {}).get("enabled", True)
+        self.replay = feed_config.get("archive", {}).get("replay", False)
+        self.breaker = breaker.circuit_breaker.from_config(
+            feed_config.get("request", {})
+        )
+        self.fast_path = feed_config.get("fast_path", True)
+        self.known.keep_days = feed_config.get("known_days", self.known.keep_days)
+        self.max_page_bytes = feed_config.get("request", {}).get(
+            "max_page_bytes", self.max_page_bytes
+        )
 
-    def pull(
-        self, feed_url: str, max_items: int = 50, timeout: int = 8
+    def set_replay(self, replay: bool) -> None:
+
+        # replay serves every feed and page from the raw archive, never the network
+        self.replay = replay
+
+    def begin_run(self) -> None:
+
+        self.duplicates = 0
+
+    def merge_duplicates(self, polls: List[Tuple[str, List[Dict[str, Any]]]]) -> None:
+
+        # polls are (source, entries) in feeds,yml order, so the owner of a
+        # canonical url is the same in a live run and in replay. later copies are
+        # dropped before any page fetch and their feeds added to the kept entry's
+        # sources; copies already taken through cleaning by another feed in an
+        # earlier run are dropped too (live runs only)
+        kept: Dict[str, Dict[str, Any]] = {}
+
+        for source, entries in polls:
+
+            survivors = []
+
+            for entry in entries:
+
+                url = entry["url"]
+                first = kept.get(url) if url else None
+
+                if first is not None and first["sources"][0] != source:
+
+                    self.duplicates += 1
+
+                    if source not in first["sources"]:
+                        first["sources"].append(source)
+
+                    # a copy with the full text (or a longer summary) spares the
+                    # owner a page fetch that may fail
+                    if not first["fulltext"] and (
+                        entry["fulltext"] or len(entry["text"]) > len(first["text"])
+                    ):
+                        first["text"] = entry["text"]
+                        first["fulltext"] = entry["fulltext"]
+
+                    continue
+
+                owner = self.known.owner(url) if url and not self.replay else None
+
+                if owner and source and owner != source:
+                    self.duplicates += 1
+                    continue
+
+                if url:
+                    kept.setdefault(url, entry)
+
+                survivors.append(entry)
+
+            entries[:] = survivors
+
+    def set_deadline(self, seconds) -> None:
+
+        # after the deadline no new request is started; callers keep what arrived
+        self.deadline = time.monotonic() + seconds if seconds else None
+
+    def time_left(self):
+
+        if self.deadline is None:
+            return None
+
+        return self.deadline - time.monotonic()
+
+    def get(self, url: str, timeout: int = 8, headers=None, read=None):
+
+        # None when the ingest deadline has passed or the host's circuit is open.
+        # with read, the body is streamed and read(r) runs before the host slot
+        # is released, and its result is returned instead of the response; a
+        # body that fails half way counts against the host like a failed request
+        left = self.time_left()
+
+        if left is not None:
+
+            if left <= 0:
+                return None
+
+            timeout = min(timeout, left)
+
+        if not self.breaker.allow(url):
+            return None
+
+        try:
+            with self.pool.limiter.slot(url):
+                r = self.session.get(
+                    url, headers=headers or {}, timeout=timeout, stream=read is not None
+                )
+                body = read(r) if read is not None and r.ok else None
+        except requests.exceptions.RequestException:
+            self.breaker.record_failure(url)
+            raise
+        except BaseException:
+            # not the host's doing (a decode error in read, say), but a half-open
+            # probe still has to be released or the host stays shut for the run
+            self.breaker.release(url)
+            raise
+
+        if r.status_code >= 500:
+            self.breaker.record_failure(url)
+        else:
+            self.breaker.record_success(url)
+
+        if read is None:
+            return r
+
+        r.close()
+        r.raise_for_status()
+        return body
+
+    def save_state(self) -> None:
+
+        if self.replay:
+            return
+
+        self.cache.save()
+
+    def remember(self, articles: List[Dict[str, Any]]) -> None:
+
+        if self.replay:
+            return
+
+        # called once articles have been through cleaning, so re-polls skip their pages
+        self.known.add_articles(articles)
+        self.known.save()
+
+    def fetch_feed(self, feed_url: str, timeout: int = 8):
+
+        # returns the raw feed body, or None when the feed is unchanged since last
+        # poll; raises when the feed could not be polled at all
+        if self.replay:
+
+            r = self.archive.get(feed_url)
+
+            if r is None:
+                print(f"No archived copy of feed {feed_url}")
+
+            return r
+
+        headers = self.cache.request_headers(feed_url) if self.use_cache else {}
+
+        r = self.get(feed_url, timeout, headers)
+
+        if r is None:
+            raise feed_skipped("host unavailable or deadline passed")
+
+        if r.status_code == 304:
+            return None
+
+        r.raise_for_status()
+
+        body = r.content
+        etag = r.headers.get("ETag")
+        last_modified = r.headers.get("Last-Modified")
+
+        if self.archive_enabled:
+            self.archive.put(feed_url, body, r.headers.get("Content-Type", ""), "feed")
+
+        if self.use_cache and self.cache.is_unchanged(feed_url, body):
+            self.cache.update(feed_url, None, etag, last_modified)
+            return None
+
+        self.cache.update(feed_url, body, etag, last_modified)
+        return r
+
+    def read_page(self, r, url: str, source: str = "") -> str:
+
+        # reads the body in chunks up to max_page_bytes; without a selector rule
+        # the paragraphs are tokenized as they arrive and the download stops as
+        # soon as max_page_chars of text has been collected
+        content_type = r.headers.get("Content-Type", "")
+        charset = r.encoding if r.encoding and "charset=" in content_type else "utf-8"
+
+        try:
+            decoder = codecs.getincrementaldecoder(charset)(errors="replace")
+        except LookupError:
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+        collector = None
+
+        if source not in self.extractor.rules:
+            collector = stream_html.paragraph_collector(self.max_page_chars)
+
+        body = bytearray()
+
+        try:
+
+            for chunk in r.iter_content(chunk_size=16384):
+
+                body.extend(chunk)
+
+                if collector is not None:
+
+                    collector.feed(decoder.decode(chunk))
+
+                    if collector.done:
+                        break
+
+                if len(body) >= self.max_page_bytes:
+                    break
+
+        finally:
+
+            r.close()
+
+        if self.archive_enabled and not self.replay:
+            self.archive.put(url, bytes(body), content_type)
+
+        if collector is not None:
+            return collector.text()
+
+        html = decoder.decode(bytes(body)[: self.max_page_bytes], final=True)
+        return self.extractor.extract(html, source, self.max_page_chars)
+
+    def fetch_fulltext(self, url: str, timeout: int = 8, source: str = "") -> str:
+
+        if self.replay:
+
+            r = self.archive.get(url)
+            return self.read_page(r, url, source) if r is not None else ""
+
+        try:
+            text = self.get(
+                url, timeout, read=lambda r: self.read_page(r, url, source)
+            )
+        except Exception:
+            return ""
+
+        return text or ""
+
+    def parse_entries(self, r, max_items: int = 50) -> List[Dict[str, Any]]:
+
+        entries = fastfeed.parse(r.content, max_items) if self.fast_path else None
+
+        if entries is None:
+
+            # RSS 1.0, malformed XML and other oddities
+            entries = feedparser.parse(
+                r.content,
+                response_headers={"content-type": r.headers.get("Content-Type", "")},
+            ).entries
+
+        return entries
+
+    def wants_page(self, url: str, guid: str = "") -> bool:
+
+        if self.replay:
+            return self.archive.has(url)
+
+        return not self.known.contains(url, guid)
+
+    def poll(
+        self, feed_url: str, max_items: int = 50, timeout: int = 8, source: str = ""
     ) -> List[Dict[str, Any]]:
+
+        # the feed's entries, before any article page is fetched
         max_items = self.feed_config.get("max_items_per_feed", max_items)
         timeout = self.feed_config.get("request", {}).get("timeout_sec", timeout)
 
-        feed = feedparser.parse(feed_url)
+        r = self.fetch_feed(feed_url, timeout)
+
+        if r is None:
+            return []
+
+        entries = self.parse_entries(r, max_items)
+
         outputs: List[Dict[str, Any]] = []
 
-        for entry in feed.entries[:max_items]:
-            url = entry.get("link", "")
+        for entry in entries[:max_items]:
+            url = canonical.canonical_url(entry.get("link", ""))
+            guid = entry.get("id", "")
             title = entry.get("title", "No Title").strip()
             ts = self.timestamp_to_iso(
                 entry.get("published", None) or entry.get("updated", "")
             )
 
             text = ""
+            fulltext = bool(entry.get("content"))
 
-            if "content" in entry and len(entry.content) > 0:
+            if fulltext:
                 text = " ".join(
-                    BeautifulSoup(c.value, "html.parser").get_text(" ", strip=True)
-                    for c in entry.content
+                    BeautifulSoup(c.get("value", ""), "html.parser").get_text(
+                        " ", strip=True
+                    )
+                    for c in entry["content"]
                 )[:10000]
             else:
                 text = (entry.get("summary") or "").strip()
 
-                if len(text) < 200 and url:
-                    try:
-                        r = requests.get(url, timeout=timeout)
-                        r.raise_for_status()
+            outputs.append(
+                {
+                    "url": url,
+                    "guid": guid,
+                    "title": title,
+                    "ts": ts,
+                    "text": text,
+                    "fulltext": fulltext,
+                    "sources": [source],
+                }
+            )
+
+        return outputs
+
+    def fill(
+        self,
+        feed_url: str,
+        outputs: List[Dict[str, Any]],
+        timeout: int = 8,
+        source: str = "",
+    ) -> List[Dict[str, Any]]:
+
+        # fetches the page of every entry whose feed text is a short summary
+        timeout = self.feed_config.get("request", {}).get("timeout_sec", timeout)
+
+        needs_fulltext = [
+            i
+            for i, o in enumerate(outputs)
+            if not o["fulltext"]
+            and len(o["text"]) < 200
+            and o["url"]
+            and self.wants_page(o["url"], o["guid"])
+        ]
+
+        # article pages for one feed are fetched in parallel, capped per host
+        pages = self.pool.map(
+            lambda i: self.fetch_fulltext(outputs[i]["url"], timeout, source),
+            needs_fulltext,
+        )
+
+        for i, page_text in zip(needs_fulltext, pages):
 
-                        soup = BeautifulSoup(r.text, "html.parser")
-                        text = " ".join(
-                            p.get_text(" ", strip=True) for p in soup.find_all("p")
-                        )[:10000]
-                    except Exception:
-                        pass
+            if page_text:
+                outputs[i]["text"] = page_text
+                outputs[i]["fulltext"] = True
 
-            outputs.append({"url": url, "title": title, "ts": ts, "text": text})
+        # a feed whose pages did not all arrive is downloaded in full next poll,
+        # so its entries left without a page are tried again
+        if not all(pages):
+            self.cache.forget(feed_url)
 
         return outputs
 
+    def pull(
+        self, feed_url: str, max_items: int = 50, timeout: int = 8, source: str = ""
+    ) -> List[Dict[str, Any]]:
+
+        outputs = self.poll(feed_url, max_items, timeout, source)
+        self.merge_duplicates([(source, outputs)])
+
+        return self.fill(feed_url, outputs, timeout, source)
+
     def in_lists(self) -> List[Dict[str, Any]]:
         all_items: List[Dict[str, Any]] = []
 
-        for feed_url in self.feed_urls:
-            items = self.pull(feed_url)
+        def pull_or_empty(feed_url: str) -> List[Dict[str, Any]]:
+
+            try:
+                return self.pull(feed_url)
+            except Exception as e:
+                print(f"Error fetching feed {feed_url}: {e}")
+                return []
+
+        for items in self.pool.map(pull_or_empty, self.feed_urls):
             all_items.extend(items)
 
+        self.save_state()
+
         return all_items
@@ -5,35 +5,49 @@ from typing import Dict, Any, Optional
 ROOT_DIR = Path(__file__).parent.parent
 
 possible_candidates = ["feeds.yml", "feeds.yaml", "feeds,yml"]
-found: Optional[Path] = None
 
-for name in possible_candidates:
+_found: Optional[Path] = None
 
-    p = ROOT_DIR / name
 
-    if p.exists():
+def find_feeds_file() -> Path:
 
-        found = p
-        break
+    # resolved on first use instead of at import, then remembered
+    global _found
 
-if found is None:
+    if _found is not None:
+        return _found
 
-    matches = list(ROOT_DIR.glob("feeds*"))
-    found = matches[0] if matches else None
+    found: Optional[Path] = None
 
-if found is None:
+    for name in possible_candidates:
 
-    raise FileNotFoundError(
+        p = ROOT_DIR / name
 
-        f"Feeds configuration file not found in {ROOT_DIR!s}. "
-        f"Expected one of: {possible_candidates!s} or files matching 'feeds*'."
-    
-    )
+        if p.exists():
 
-FILE_PATH: Path = found
+            found = p
+            break
 
+    if found is None:
 
-def load_feeds(file_path: Path = FILE_PATH) -> Dict[str, Any]:
+        matches = list(ROOT_DIR.glob("feeds*"))
+        found = matches[0] if matches else None
+
+    if found is None:
+
+        raise FileNotFoundError(
+            f"Feeds configuration file not found in {ROOT_DIR!s}. "
+            f"Expected one of: {possible_candidates!s} or files matching 'feeds*'."
+        )
+
+    _found = found
+    return found
+
+
+def load_feeds(file_path: Optional[Path] = None) -> Dict[str, Any]:
+
+    if file_path is None:
+        file_path = find_feeds_file()
 
     if not file_path or not file_path.exists():
         raise FileNotFoundError(f"Feeds configuration file not found: {file_path}")
@@ -0,0 +1,72 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from typing import Any, Dict, Optional
+
+DEFAULT_HEADERS = {"User-Agent": "SpaceRadar/1.0"}
+
+_sessions: Dict[str, "pooled_session"] = {}
+_lock = threading.Lock()
+
+
+class pooled_session(requests.Session):
+
+    # keep-alive session with a connection pool per host and a default timeout
+
+    def __init__(self, request_config: Optional[Dict[str, Any]] = None):
+
+        super().__init__()
+
+        config = request_config or {}
+
+        self.config = config
+        self.timeout = config.get("timeout_sec", 8)
+        self.headers.update(DEFAULT_HEADERS)
+        self.headers.update(config.get("headers", {}) or {})
+
+        pool_cfg = config.get("pool", {}) or {}
+        adapter = HTTPAdapter(
+            pool_connections=pool_cfg.get("hosts", 32),
+            pool_maxsize=pool_cfg.get("per_host", 4),
+            max_retries=pool_cfg.get("retries", 0),
+        )
+
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def request(self, method, url, **kwargs):
+
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, **kwargs)
+
+
+def get_session(
+    request_config: Optional[Dict[str, Any]] = None, name: str = "default"
+) -> pooled_session:
+
+    # one session per name and process, so every caller shares the same pool
+    with _lock:
+
+        session = _sessions.get(name)
+
+        if session is None or (
+            request_config is not None and request_config != session.config
+        ):
+
+            if session is not None:
+                session.close()
+
+            session = _sessions[name] = pooled_session(request_config)
+
+        return session
+
+
+def reset_sessions() -> None:
+
+    with _lock:
+
+        for session in _sessions.values():
+
+            session.close()
+
+        _sessions.clear()
@@ -0,0 +1,247 @@
+import json
+import mmap
+import os
+import hashlib
+import threading
+from pathlib import Path
+from typing import Iterable, List
+
+DB_DIR = Path(__file__).parent.parent / "db"
+IDS_DIR = DB_DIR / "ids"
+LEGACY_INDEX = DB_DIR / "index.json"
+
+RECORD = 16
+
+
+def id_key(article_id: str) -> bytes:
+
+    # article ids are md5 hex digests, stored as their 16 raw bytes; anything
+    # else (hand-edited legacy entries) is hashed down to the same width
+    if len(article_id) == 2 * RECORD:
+
+        try:
+            return bytes.fromhex(article_id)
+        except ValueError:
+            pass
+
+    return hashlib.md5(article_id.encode("utf-8")).digest()
+
+
+def read_legacy(path: Path = LEGACY_INDEX) -> List[str]:
+
+    # the old index.json: {"id": [...]} or {"ids": [...]}
+    try:
+
+        with open(path, "r", encoding="utf-8") as f:
+
+            data = json.load(f) or {}
+
+    except FileNotFoundError:
+
+        return []
+
+    for key in ("id", "ids"):
+
+        if isinstance(data.get(key), list):
+            return data[key]
+
+    return []
+
+
+class id_store:
+
+    # every article id the clean stage has indexed. a sorted segment of 16 byte
+    # keys is searched in place through mmap; new ids are appended to a log
+    # (and kept in memory) until compaction merges the log into a new segment
+
+    def __init__(
+        self,
+        root: Path = IDS_DIR,
+        legacy_path: Path = LEGACY_INDEX,
+        compact_every: int = 4096,
+    ):
+
+        self.root = Path(root)
+        self.segment_file = self.root / "segment.bin"
+        self.log_file = self.root / "wal.log"
+        self.compact_every = compact_every
+        self.lock = threading.Lock()
+
+        self.segment = None
+        self.segment_size = 0
+        self.pending = set()
+        self.log = None
+
+        self.root.mkdir(parents=True, exist_ok=True)
+
+        if not self.segment_file.exists() and not self.log_file.exists():
+            self.import_legacy(legacy_path)
+
+        self.open_segment()
+        self.load_log()
+
+    def import_legacy(self, legacy_path: Path) -> None:
+
+        ids = read_legacy(legacy_path)
+
+        if ids:
+            print(f"Importing {len(ids)} ids from {legacy_path}")
+
+        self.write_segment(sorted({id_key(i) for i in ids}))
+
+    def write_segment(self, keys: List[bytes]) -> None:
+
+        tmp = self.segment_file.with_suffix(".tmp")
+
+        with open(tmp, "wb") as f:
+
+            f.write(b"".join(keys))
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(tmp, self.segment_file)
+
+    def open_segment(self) -> None:
+
+        if self.segment is not None:
+            self.segment.close()
+            self.segment = None
+
+        size = self.segment_file.stat().st_size if self.segment_file.exists() else 0
+        self.segment_size = size // RECORD
+
+        if self.segment_size:
+
+            with open(self.segment_file, "rb") as f:
+
+                self.segment = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def load_log(self) -> None:
+
+        if self.log_file.exists():
+
+            data = self.log_file.read_bytes()
+            whole = len(data) - len(data) % RECORD
+
+            for i in range(0, whole, RECORD):
+
+                key = data[i : i + RECORD]
+
+                if not self.in_segment(key):
+                    self.pending.add(key)
+
+            # drop a torn last record from an interrupted append, so new
+            # records stay aligned
+            if whole != len(data):
+                os.truncate(self.log_file, whole)
+
+        self.log = open(self.log_file, "ab")
+
+    def in_segment(self, key: bytes) -> bool:
+
+        lo, hi = 0, self.segment_size
+
+        while lo < hi:
+
+            mid = (lo + hi) // 2
+            probe = self.segment[mid * RECORD : (mid + 1) * RECORD]
+
+            if probe < key:
+                lo = mid + 1
+            elif probe > key:
+                hi = mid
+            else:
+                return True
+
+        return False
+
+    def __contains__(self, article_id: str) -> bool:
+
+        key = id_key(article_id)
+
+        with self.lock:
+
+            return key in self.pending or self.in_segment(key)
+
+    def __len__(self) -> int:
+
+        return self.segment_size + len(self.pending)
+
+    def add_many(self, article_ids: Iterable[str]) -> int:
+
+        added = []
+
+        with self.lock:
+
+            for article_id in article_ids:
+
+                key = id_key(article_id)
+
+                if key in self.pending or self.in_segment(key):
+                    continue
+
+                self.pending.add(key)
+                added.append(key)
+
+            if added:
+
+                self.log.write(b"".join(added))
+                self.log.flush()
+                os.fsync(self.log.fileno())
+
+        if len(self.pending) >= self.compact_every:
+            self.compact()
+
+        return len(added)
+
+    def add(self, article_id: str) -> bool:
+
+        return self.add_many([article_id]) == 1
+
+    def compact(self) -> None:
+
+        # a crash after the new segment is in place but before the log is
+        # truncated only leaves ids in the log that the segment already has
+        with self.lock:
+
+            if not self.pending:
+                return
+
+            existing = self.segment[:] if self.segment is not None else b""
+            keys = [existing[i : i + RECORD] for i in range(0, len(existing), RECORD)]
+            keys.extend(self.pending)
+            keys.sort()
+
+            self.write_segment(keys)
+            self.open_segment()
+
+            self.log.close()
+            self.log = open(self.log_file, "wb")
+            self.pending = set()
+
+    def close(self) -> None:
+
+        if self.log is not None:
+            self.log.close()
+            self.log = None
+
+        if self.segment is not None:
+            self.segment.close()
+            self.segment = None
+
+
+def count_ids(root: Path = IDS_DIR, legacy_path: Path = LEGACY_INDEX) -> int:
+
+    # read-only count for data_pipeline.check_outputs, without migrating
+    segment_file = Path(root) / "segment.bin"
+    log_file = Path(root) / "wal.log"
+
+    if not segment_file.exists() and not log_file.exists():
+        return len(read_legacy(legacy_path))
+
+    store = id_store(root, legacy_path)
+
+    try:
+        return len(store)
+    finally:
+        store.close()
@@ -0,0 +1,170 @@
+import json
+import os
+import threading
+import datetime as dt
+import importlib.util
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+DB_DIR = Path(__file__).parent.parent / "db"
+KNOWN_FILE = DB_DIR / "known_entries.json"
+
+spec = importlib.util.spec_from_file_location(
+    "canonical", Path(__file__).parent / "canonical.py"
+)
+canonical = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(canonical)
+
+
+class known_index:
+
+    # feed entries that a previous run already took through cleaning, keyed by
+    # canonical url (mapped to the source that first carried it) and by guid.
+    # each key keeps the last day a feed carried it; keys no feed has carried for
+    # keep_days are dropped on save, so the file tracks the feeds' windows
+
+    def __init__(self, path: Path = KNOWN_FILE, keep_days: int = 30):
+
+        self.path = Path(path)
+        self.keep_days = keep_days
+        self.lock = threading.Lock()
+        self.urls: Dict[str, str] = {}
+        self.guids: Dict[str, str] = {}
+        self.seen: Dict[str, str] = {}
+        self.today = dt.date.today().isoformat()
+        self.dirty = False
+        self.load()
+
+    def load(self) -> None:
+
+        try:
+
+            if self.path.exists():
+
+                with open(self.path, "r", encoding="utf-8") as f:
+
+                    data = json.load(f) or {}
+
+                urls = data.get("urls", {})
+                guids = data.get("guids", {})
+
+                # older files stored a plain list of raw links, then a plain
+                # source per url and a list of guids, with no last-seen day
+                if isinstance(urls, list):
+                    urls = {u: "" for u in urls}
+
+                if isinstance(guids, list):
+                    guids = {g: self.today for g in guids}
+
+                for u, value in urls.items():
+
+                    source, seen = value if isinstance(value, list) else (value, "")
+                    u = canonical.canonical_url(u)
+                    self.urls[u] = source
+                    self.seen[u] = seen or self.today
+
+                self.guids = dict(guids)
+
+        except Exception as e:
+
+            print(f"Error loading known entries {self.path}: {e}")
+
+    def contains(self, url: str = "", guid: str = "") -> bool:
+
+        url = canonical.canonical_url(url)
+
+        with self.lock:
+
+            found = False
+
+            # a hit means a feed still carries the entry, so it stays known
+            if url and url in self.urls:
+                found = True
+                self.touch(self.seen, url)
+
+            if guid and guid in self.guids:
+                found = True
+                self.touch(self.guids, guid)
+
+            return found
+
+    def touch(self, days: Dict[str, str], key: str) -> None:
+
+        if days.get(key) != self.today:
+            days[key] = self.today
+            self.dirty = True
+
+    def owner(self, url: str) -> Optional[str]:
+
+        # the source that first carried this url, "" if unrecorded, None if unseen
+        with self.lock:
+
+            return self.urls.get(canonical.canonical_url(url))
+
+    def add(self, url: str = "", guid: str = "", source: str = "") -> None:
+
+        url = canonical.canonical_url(url)
+
+        with self.lock:
+
+            if url and not self.urls.get(url):
+                self.urls[url] = source
+                self.dirty = True
+
+            if url:
+                self.touch(self.seen, url)
+
+            if guid:
+                self.touch(self.guids, guid)
+
+    def add_articles(self, articles: Iterable[Dict[str, Any]]) -> None:
+
+        for article in articles:
+
+            self.add(
+                article.get("article_url") or article.get("url", ""),
+                article.get("guid", ""),
+                article.get("source", ""),
+            )
+
+    def prune(self) -> None:
+
+        cutoff = (dt.date.today() - dt.timedelta(days=self.keep_days)).isoformat()
+
+        for url in [u for u, seen in self.seen.items() if seen < cutoff]:
+            del self.urls[url]
+            del self.seen[url]
+            self.dirty = True
+
+        for guid in [g for g, seen in self.guids.items() if seen < cutoff]:
+            del self.guids[guid]
+            self.dirty = True
+
+    def save(self) -> None:
+
+        with self.lock:
+
+            self.prune()
+
+            if not self.dirty:
+                return
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+
+            with open(tmp, "w", encoding="utf-8") as f:
+
+                json.dump(
+                    {
+                        "urls": {
+                            u: [s, self.seen[u]] for u, s in sorted(self.urls.items())
+                        },
+                        "guids": dict(sorted(self.guids.items())),
+                    },
+                    f,
+                    ensure_ascii=False,
+                    indent=2,
+                )
+
+            os.replace(tmp, self.path)
+            self.dirty = False
@@ -0,0 +1,160 @@
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List
+
+DB_DIR = Path(__file__).parent.parent / "db"
+BY_DATE_DIR = DB_DIR / "by_date"
+
+# data/db/by_date holds one partition per UTC day. current partitions are JSON
+# Lines (<day>.jsonl) that the clean stage only ever appends to; <day>.json
+# arrays from before are still read until migrated:
+#
+#   python data/agents/partitions.py --migrate [--dry-run]
+
+
+def partition_files(root: Path = BY_DATE_DIR) -> List[Path]:
+
+    root = Path(root)
+
+    if not root.exists():
+        return []
+
+    files = [p for p in root.iterdir() if p.suffix in (".jsonl", ".json")]
+
+    # by day, a legacy array before the jsonl that continues the same day
+    return sorted(files, key=lambda p: (p.stem, p.suffix == ".jsonl"))
+
+
+def iter_file(path: Path) -> Iterator[Dict[str, Any]]:
+
+    path = Path(path)
+
+    if path.suffix == ".json":
+
+        with open(path, "r", encoding="utf-8") as f:
+
+            yield from json.load(f) or []
+
+        return
+
+    with open(path, "r", encoding="utf-8") as f:
+
+        for line in f:
+
+            line = line.strip()
+
+            if not line:
+                continue
+
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                # a torn last line from an interrupted append
+                print(f"Skipping unreadable line in {path}")
+
+
+def iter_articles(root: Path = BY_DATE_DIR) -> Iterator[Dict[str, Any]]:
+
+    for path in partition_files(root):
+
+        try:
+            yield from iter_file(path)
+        except Exception as e:
+            print(f"Error loading {path}: {e}")
+
+
+def count(path: Path) -> int:
+
+    return sum(1 for _ in iter_file(path))
+
+
+def append(
+    articles: Iterable[Dict[str, Any]], day: str, root: Path = BY_DATE_DIR
+) -> Path:
+
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    path = root / f"{day}.jsonl"
+
+    lines = "".join(json.dumps(a, ensure_ascii=False) + "\n" for a in articles)
+
+    # start on a fresh line after a torn append, so only that record is lost
+    if path.exists() and path.stat().st_size:
+
+        with open(path, "rb") as f:
+
+            f.seek(-1, os.SEEK_END)
+
+            if f.read(1) != b"\n":
+                lines = "\n" + lines
+
+    with open(path, "a", encoding="utf-8") as f:
+
+        f.write(lines)
+        f.flush()
+        os.fsync(f.fileno())
+
+    return path
+
+
+def migrate(root: Path = BY_DATE_DIR, dry_run: bool = False) -> int:
+
+    # folds each <day>.json into <day>.jsonl (legacy records first, then any
+    # already appended), keeping the first record per id so an interrupted
+    # migration can simply be run again
+    migrated = 0
+
+    for legacy in [p for p in partition_files(root) if p.suffix == ".json"]:
+
+        target = legacy.with_suffix(".jsonl")
+        seen = set()
+        records = []
+
+        for source in (legacy, target):
+
+            if not source.exists():
+                continue
+
+            for record in iter_file(source):
+
+                key = record.get("id")
+
+                if key is not None and key in seen:
+                    continue
+
+                seen.add(key)
+                records.append(record)
+
+        print(f"{legacy.name} -> {target.name}: {len(records)} articles")
+        migrated += 1
+
+        if dry_run:
+            continue
+
+        tmp = target.with_suffix(".jsonl.tmp")
+
+        with open(tmp, "w", encoding="utf-8") as f:
+
+            for record in records:
+
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(tmp, target)
+        legacy.unlink()
+
+    return migrated
+
+
+if __name__ == "__main__":
+
+    if "--migrate" not in sys.argv:
+        print("usage: python data/agents/partitions.py --migrate [--dry-run]")
+        sys.exit(1)
+
+    n = migrate(dry_run="--dry-run" in sys.argv)
+    print(f"Migrated {n} partitions" if n else "Nothing to migrate")
@@ -0,0 +1,134 @@
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+from urllib.parse import urlparse
+
+
+class limiter:
+
+    # caps how many requests are in flight at once, both overall and per host
+
+    def __init__(self, max_workers: int = 8, per_host: int = 2):
+
+        self.max_workers = max(1, int(max_workers))
+        self.per_host = max(1, int(per_host))
+        self.global_slots = threading.BoundedSemaphore(self.max_workers)
+        self.host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self.lock = threading.Lock()
+
+    def host_of(self, url: str) -> str:
+
+        try:
+            return urlparse(url).netloc.lower()
+        except Exception:
+            return ""
+
+    def host_slot(self, url: str) -> threading.BoundedSemaphore:
+
+        host = self.host_of(url)
+
+        with self.lock:
+
+            if host not in self.host_slots:
+
+                self.host_slots[host] = threading.BoundedSemaphore(self.per_host)
+
+            return self.host_slots[host]
+
+    @contextmanager
+    def slot(self, url: str):
+
+        # take the host slot first so a busy host never holds a global slot idle
+        host_slot = self.host_slot(url)
+
+        with host_slot:
+
+            with self.global_slots:
+
+                yield
+
+
+class fetch_pool:
+
+    def __init__(self, max_workers: int = 8, per_host: int = 2):
+
+        self.max_workers = max(1, int(max_workers))
+        self.limiter = limiter(self.max_workers, per_host)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "fetch_pool":
+
+        conc = (config or {}).get("concurrency", {}) or {}
+
+        return cls(
+            max_workers=conc.get("max_workers", 8),
+            per_host=conc.get("per_host", 2),
+        )
+
+    def map(
+        self,
+        fn: Callable[[Any], Any],
+        items: Iterable[Any],
+        timeout: Optional[float] = None,
+    ) -> List[Any]:
+
+        # results in input order; with a timeout, items still running when it
+        # expires are dropped from the result instead of being waited for
+        items = list(items)
+
+        if not items:
+            return []
+
+        if len(items) == 1 and timeout is None:
+            return [fn(items[0])]
+
+        workers = min(self.max_workers, len(items))
+        ex = ThreadPoolExecutor(max_workers=workers)
+
+        try:
+
+            futures = [ex.submit(fn, item) for item in items]
+            _, pending = wait(futures, timeout=timeout)
+
+            if pending:
+                print(f"Deadline reached with {len(pending)} of {len(items)} pending")
+
+            return [f.result() for f in futures if f not in pending]
+
+        finally:
+
+            ex.shutdown(wait=False, cancel_futures=True)
+
+    def imap_unordered(
+        self,
+        fn: Callable[[Any], Any],
+        items: Iterable[Any],
+        timeout: Optional[float] = None,
+    ) -> Iterator[Any]:
+
+        # yields each result as soon as it is ready, in completion order
+        items = list(items)
+
+        if not items:
+            return
+
+        workers = min(self.max_workers, len(items))
+        ex = ThreadPoolExecutor(max_workers=workers)
+
+        try:
+
+            futures = [ex.submit(fn, item) for item in items]
+
+            for future in as_completed(futures, timeout=timeout):
+
+                yield future.result()
+
+        except TimeoutError:
+
+            pending = sum(1 for f in futures if not f.done())
+            print(f"Deadline reached with {pending} of {len(items)} pending")
+
+        finally:
+
+            ex.shutdown(wait=False, cancel_futures=True)
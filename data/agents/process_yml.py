@@ -3,25 +3,48 @@ import hashlib
 from pathlib import Path
 
 LIB_DIR = Path(__file__).parent
-LIB_NAME = "fetch"
-LIB2_NAME = "from_yml"
 
-spec = importlib.util.spec_from_file_location(LIB_NAME, LIB_DIR / f"{LIB_NAME}.py")
-fetch = importlib.util.module_from_spec(spec)
+_libs = {}
 
-spec1 = importlib.util.spec_from_file_location(LIB2_NAME, LIB_DIR / f"{LIB2_NAME}.py")
-from_yml = importlib.util.module_from_spec(spec1)
 
-spec.loader.exec_module(fetch)
-spec1.loader.exec_module(from_yml)
+def load_lib(name: str):
+
+    # fetch pulls in requests/feedparser/bs4, so sibling modules are only
+    # executed when a processer is built, and only once per process
+    if name not in _libs:
+
+        spec = importlib.util.spec_from_file_location(name, LIB_DIR / f"{name}.py")
+        lib = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(lib)
+        _libs[name] = lib
+
+    return _libs[name]
 
 
 class processer:
 
     def __init__(self):
 
-        self.data = from_yml.load_feeds()
-        self.fetcher = fetch.fetcher()
+        self.data = load_lib("from_yml").load_feeds()
+        self.fetcher = load_lib("fetch").fetcher()
+        self.fetcher.set_config(self.fetch_config())
+        self.scheduler = load_lib("schedule").poll_scheduler(
+            (self.data.get("defaults", {}) or {}).get("schedule", {})
+        )
+        self.poll_all = False
+        self.defer_feed_cache = False
+
+    def fetch_config(self):
+
+        defaults = self.data.get("defaults", {}) or {}
+
+        config = dict(defaults.get("parse", {}) or {})
+        config["request"] = defaults.get("request", {}) or {}
+        config["concurrency"] = defaults.get("concurrency", {}) or {}
+        config["selectors"] = self.data.get("selectors", {}) or {}
+        config["archive"] = defaults.get("archive", {}) or {}
+
+        return config
 
     def example_archetecture(self):
 
@@ -73,30 +96,156 @@ class processer:
 
             yield source
 
+    def poll_source(self, source):
+
+        feed_url = source.get("url", "")
+
+        try:
+
+            articles = self.fetcher.poll(feed_url, source=source.get("name", ""))
+            polled = True
+
+        except Exception as e:
+
+            print(f"Failed to fetch {source.get('name', feed_url)}: {e}")
+            articles = []
+            polled = False
+
+        # only a feed that answered (200 or 304) says anything about its cadence;
+        # errors, an open circuit and the deadline leave its schedule alone
+        if polled and not self.fetcher.replay:
+
+            new_items = sum(
+                1
+                for article in articles
+                if not self.fetcher.known.contains(
+                    article.get("url", ""), article.get("guid", "")
+                )
+            )
+            self.scheduler.record(source, new_items)
+
+        return {
+            "source": source.get("name", "Unknown"),
+            "url": feed_url,
+            "articles": articles,
+        }
+
+    def fill_source(self, source_data):
+
+        self.fetcher.fill(
+            source_data["url"], source_data["articles"], source=source_data["source"]
+        )
+
+        return source_data
+
+    def is_due(self, source):
+
+        if self.poll_all or self.fetcher.replay:
+            return True
+
+        if self.scheduler.is_due(source):
+            return True
+
+        wait = self.scheduler.minutes_until_due(source)
+        print(f"Skipping {source.get('name', 'Unknown')}: next poll in {wait:.0f} min")
+
+        return False
+
+    def fetchable_sources(self):
+
+        return [
+            source
+            for source in self.yeild_sources_info()
+            if source.get("url", "") and self.is_due(source)
+        ]
+
+    def report_duplicates(self):
+
+        if self.fetcher.duplicates:
+
+            print(f"Merged {self.fetcher.duplicates} cross-feed duplicate entries")
+
+    def save_state(self):
+
+        # clean.py saves the feed validators itself, once the articles they
+        # cover are stored, so a crash in between re-fetches those feeds
+        if not self.defer_feed_cache:
+            self.fetcher.save_state()
+
+        if not self.fetcher.replay:
+            self.scheduler.save()
+
+    def start_deadline(self):
+
+        self.fetcher.begin_run()
+
+        request = (self.data.get("defaults", {}) or {}).get("request", {}) or {}
+        self.fetcher.set_deadline(request.get("ingest_deadline_sec"))
+
+        return self.fetcher.time_left()
+
+    def poll_sources(self):
+
+        timeout = self.start_deadline()
+
+        # feeds are polled in parallel (results keep the order of feeds,yml),
+        # then cross-feed copies are merged in that order before any page fetch
+        polled = self.fetcher.pool.map(
+            self.poll_source, self.fetchable_sources(), timeout=timeout
+        )
+        self.fetcher.merge_duplicates([(p["source"], p["articles"]) for p in polled])
+        self.report_duplicates()
+
+        return polled
+
     def fetch_sources_raw(self):
 
-        sources_raw = []
+        # every page request is itself bounded by the deadline
+        sources_raw = self.fetcher.pool.map(self.fill_source, self.poll_sources())
+        self.save_state()
 
-        for source in self.yeild_sources_info():
+        return sources_raw
+
+    def iter_sources_raw(self):
+
+        # same records as fetch_sources_raw, yielded as each feed's pages arrive
+        try:
+
+            yield from self.fetcher.pool.imap_unordered(
+                self.fill_source, self.poll_sources()
+            )
 
-            feed_url = source.get("url", "")
+        finally:
 
-            if not feed_url:
-                continue
+            self.save_state()
 
-            articles = self.fetcher.pull(feed_url)
+    def source_articales(self, source_data):
 
-            sources_raw.append(
+        articles = []
+
+        for article in source_data.get("articles", []):
+
+            articles.append(
                 {
-                    "source": source.get("name", "Unknown"),
-                    "url": feed_url,
-                    "articles": articles,
+                    "source": source_data.get("source", "Unknown"),
+                    "source_url": source_data.get("url", ""),
+                    "article_url": article.get("url", ""),
+                    "guid": article.get("guid", ""),
+                    "title": article.get("title", ""),
+                    "timestamp": article.get("ts", ""),
+                    "text": article.get("text", ""),
+                    "fulltext": article.get("fulltext", False),
+                    "sources": article.get("sources", []),
                 }
             )
 
-        return sources_raw
+        return articles
+
+    def get_articales(self, raw_data=None, replay=None):
+
+        if replay is not None:
 
-    def get_articales(self, raw_data=None):
+            self.fetcher.set_replay(replay)
 
         if raw_data is None:
 
@@ -106,21 +255,32 @@ class processer:
 
         for source_data in raw_data:
 
-            for article in source_data.get("articles", []):
+            articles.extend(self.source_articales(source_data))
 
-                articles.append(
-                    {
-                        "source": source_data.get("source", "Unknown"),
-                        "source_url": source_data.get("url", ""),
-                        "article_url": article.get("url", ""),
-                        "title": article.get("title", ""),
-                        "timestamp": article.get("ts", ""),
-                        "text": article.get("text", ""),
-                    }
-                )
         print("Total articles fetched:", len(articles))
         return articles
 
+    def iter_articales(self, raw_data=None, replay=None):
+
+        if replay is not None:
+
+            self.fetcher.set_replay(replay)
+
+        if raw_data is None:
+
+            raw_data = self.iter_sources_raw()
+
+        count = 0
+
+        for source_data in raw_data:
+
+            for article in self.source_articales(source_data):
+
+                count += 1
+                yield article
+
+        print("Total articles fetched:", count)
+
 
 if __name__ == "__main__":
 
@@ -0,0 +1,150 @@
+import json
+import os
+import threading
+import datetime as dt
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+DB_DIR = Path(__file__).parent.parent / "db"
+SCHEDULE_FILE = DB_DIR / "feed_schedule.json"
+
+
+class poll_scheduler:
+
+    # learns how often each feed publishes and only polls it once it is due.
+    # the interval aims for roughly one new item per poll, from an EWMA of the
+    # observed new-items-per-hour rate, clamped to [min_interval, max_interval]
+
+    def __init__(
+        self, config: Optional[Dict[str, Any]] = None, path: Path = SCHEDULE_FILE
+    ):
+
+        config = config or {}
+
+        self.enabled = config.get("enabled", True)
+        self.min_interval = float(config.get("min_interval_min", 15))
+        self.max_interval = float(config.get("max_interval_min", 1440))
+        self.initial_interval = float(config.get("initial_interval_min", 60))
+        self.smoothing = float(config.get("smoothing", 0.5))
+        self.backoff = float(config.get("backoff", 1.5))
+
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        self.state: Dict[str, Dict[str, Any]] = self.load()
+        self.dirty = False
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+
+        try:
+
+            if self.path.exists():
+
+                with open(self.path, "r", encoding="utf-8") as f:
+
+                    data = json.load(f) or {}
+
+                return data if isinstance(data, dict) else {}
+
+        except Exception as e:
+
+            print(f"Error loading feed schedule {self.path}: {e}")
+
+        return {}
+
+    def now(self) -> dt.datetime:
+
+        return dt.datetime.now(dt.timezone.utc)
+
+    def bounds(self, source: Dict[str, Any]):
+
+        poll = source.get("poll", {}) or {}
+
+        if "interval_min" in poll:
+
+            fixed = float(poll["interval_min"])
+            return fixed, fixed
+
+        return (
+            float(poll.get("min_interval_min", self.min_interval)),
+            float(poll.get("max_interval_min", self.max_interval)),
+        )
+
+    def interval(self, source: Dict[str, Any]) -> float:
+
+        low, high = self.bounds(source)
+
+        with self.lock:
+            entry = self.state.get(source.get("url", ""), {})
+
+        current = float(entry.get("interval_min", self.initial_interval))
+        return min(high, max(low, current))
+
+    def minutes_until_due(self, source: Dict[str, Any], now=None) -> float:
+
+        with self.lock:
+            last = self.state.get(source.get("url", ""), {}).get("last_polled")
+
+        if not last:
+            return 0.0
+
+        now = now or self.now()
+        elapsed = (now - dt.datetime.fromisoformat(last)).total_seconds() / 60.0
+
+        return max(0.0, self.interval(source) - elapsed)
+
+    def is_due(self, source: Dict[str, Any], now=None) -> bool:
+
+        if not self.enabled:
+            return True
+
+        return self.minutes_until_due(source, now) <= 0.0
+
+    def record(self, source: Dict[str, Any], new_items: int, now=None) -> None:
+
+        now = now or self.now()
+        url = source.get("url", "")
+        low, high = self.bounds(source)
+
+        with self.lock:
+
+            entry = self.state.setdefault(url, {})
+            last = entry.get("last_polled")
+            interval = float(entry.get("interval_min", self.initial_interval))
+
+            if last:
+
+                elapsed = now - dt.datetime.fromisoformat(last)
+                hours = max(elapsed.total_seconds() / 3600.0, 1 / 60.0)
+                rate = new_items / hours
+
+                old_rate = float(entry.get("rate_per_hour", rate))
+                rate = self.smoothing * rate + (1 - self.smoothing) * old_rate
+                entry["rate_per_hour"] = rate
+
+                if rate > 0:
+                    interval = 60.0 / rate
+                else:
+                    interval = interval * self.backoff
+
+            entry["interval_min"] = min(high, max(low, interval))
+            entry["last_polled"] = now.isoformat()
+            entry["last_new_items"] = new_items
+
+            self.dirty = True
+
+    def save(self) -> None:
+
+        with self.lock:
+
+            if not self.dirty:
+                return
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+
+            with open(tmp, "w", encoding="utf-8") as f:
+
+                json.dump(self.state, f, ensure_ascii=False, indent=2)
+
+            os.replace(tmp, self.path)
+            self.dirty = False
@@ -0,0 +1,384 @@
+import json
+import os
+import sys
+import sqlite3
+import threading
+import importlib.util
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+LIB_DIR = Path(__file__).parent
+ROOT_DIR = LIB_DIR.parent.parent
+DB_DIR = LIB_DIR.parent / "db"
+SQLITE_FILE = DB_DIR / "space_radar.sqlite"
+
+# one storage interface for the articles the clean stage keeps, the story
+# candidates from clustering and the scored stories from the LLM stage.
+#
+#   json   - by_date/*.jsonl, story_candidates.json, stories.json (default)
+#   sqlite - one WAL-mode database with incremental upserts and indexed reads
+#
+# picked by defaults.storage.backend in feeds,yml, or SPACE_RADAR_STORAGE.
+# moving existing JSON state into SQLite:
+#
+#   python data/agents/storage.py --import-json
+
+
+def story_rank(story: Dict[str, Any]) -> float:
+
+    # the front page ranks stories by their LLM score, else the overall score
+    score = story.get("score_components", {}).get("llm_score", story.get("score", 0))
+    return float(score or 0.0)
+
+
+def load_lib(name: str):
+
+    spec = importlib.util.spec_from_file_location(name, LIB_DIR / f"{name}.py")
+    lib = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(lib)
+    return lib
+
+
+class json_storage:
+
+    def __init__(self, db_dir: Path = DB_DIR):
+
+        self.db_dir = Path(db_dir)
+        self.by_date_dir = self.db_dir / "by_date"
+        self.candidates_file = self.db_dir / "story_candidates.json"
+        self.stories_file = self.db_dir / "stories.json"
+        self.partitions = load_lib("partitions")
+
+    def add_articles(self, articles: List[Dict[str, Any]], day: str) -> None:
+
+        self.partitions.append(articles, day, self.by_date_dir)
+
+    def iter_articles(self) -> Iterator[Dict[str, Any]]:
+
+        return self.partitions.iter_articles(self.by_date_dir)
+
+    def article_counts(self, days: Optional[int] = None) -> Dict[str, int]:
+
+        # articles per day, for the last `days` days stored (all when None)
+        files = self.partitions.partition_files(self.by_date_dir)
+        keep = sorted({p.stem for p in files})[-days:] if days else None
+        counts: Dict[str, int] = {}
+
+        for path in files:
+
+            if keep is None or path.stem in keep:
+                n = self.partitions.count(path)
+                counts[path.stem] = counts.get(path.stem, 0) + n
+
+        return counts
+
+    def read_json(self, path: Path):
+
+        if not path.exists():
+            return None
+
+        with open(path, "r", encoding="utf-8") as f:
+
+            return json.load(f)
+
+    def write_json(self, path: Path, data) -> None:
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+
+        with open(tmp, "w", encoding="utf-8") as f:
+
+            json.dump(data, f, indent=4, ensure_ascii=False)
+
+        os.replace(tmp, path)
+
+    def load_candidates(self) -> Optional[List[Dict[str, Any]]]:
+
+        # None when the clustering stage has never written any
+        return self.read_json(self.candidates_file)
+
+    def save_candidates(self, candidates: List[Dict[str, Any]]) -> None:
+
+        self.write_json(self.candidates_file, candidates)
+
+    def load_stories(self) -> List[Dict[str, Any]]:
+
+        return self.read_json(self.stories_file) or []
+
+    def save_stories(self, stories: List[Dict[str, Any]]) -> None:
+
+        self.write_json(self.stories_file, stories)
+
+    def top_stories(self, limit: int) -> List[Dict[str, Any]]:
+
+        stories = sorted(
+            self.load_stories(),
+            key=lambda s: (story_rank(s), s.get("timestamp", "")),
+            reverse=True,
+        )
+        return stories[:limit]
+
+    def close(self) -> None:
+
+        return None
+
+
+class sqlite_storage:
+
+    # rows keep the full record as JSON next to the indexed columns, so reads
+    # return exactly what was written; position preserves list order and
+    # stories.score holds story_rank(), the order the front page shows
+
+    SCHEMA = [
+        "CREATE TABLE IF NOT EXISTS articles ("
+        "id TEXT PRIMARY KEY, day TEXT NOT NULL, timestamp TEXT, source TEXT, "
+        "url TEXT, data TEXT NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS articles_timestamp ON articles(timestamp)",
+        "CREATE INDEX IF NOT EXISTS articles_source ON articles(source)",
+        "CREATE INDEX IF NOT EXISTS articles_day ON articles(day)",
+        "CREATE TABLE IF NOT EXISTS candidates ("
+        "cluster_id TEXT PRIMARY KEY, position INTEGER NOT NULL, "
+        "timestamp TEXT, data TEXT NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS stories ("
+        "cluster_id TEXT PRIMARY KEY, position INTEGER NOT NULL, "
+        "timestamp TEXT, score REAL, data TEXT NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS stories_timestamp ON stories(timestamp)",
+        "CREATE INDEX IF NOT EXISTS stories_score ON stories(score)",
+        "CREATE INDEX IF NOT EXISTS stories_rank "
+        "ON stories(score DESC, timestamp DESC, position)",
+        "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)",
+    ]
+
+    def __init__(self, path: Path = SQLITE_FILE):
+
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+
+        # shared by the Flask worker threads, serialized by self.lock
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+
+        with self.conn:
+
+            for statement in self.SCHEMA:
+
+                self.conn.execute(statement)
+
+    def add_articles(self, articles: List[Dict[str, Any]], day: str) -> None:
+
+        rows = [
+            (
+                a.get("id", ""),
+                day,
+                a.get("timestamp", ""),
+                a.get("source", ""),
+                a.get("url", ""),
+                json.dumps(a, ensure_ascii=False),
+            )
+            for a in articles
+        ]
+
+        with self.lock, self.conn:
+
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO articles "
+                "(id, day, timestamp, source, url, data) VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def iter_articles(self) -> Iterator[Dict[str, Any]]:
+
+        # streamed from the cursor a batch at a time, never the whole table
+        with self.lock:
+
+            cursor = self.conn.execute("SELECT data FROM articles ORDER BY day, rowid")
+
+        while True:
+
+            with self.lock:
+
+                rows = cursor.fetchmany(500)
+
+            if not rows:
+                break
+
+            for (data,) in rows:
+
+                yield json.loads(data)
+
+    def article_counts(self, days: Optional[int] = None) -> Dict[str, int]:
+
+        query = "SELECT day, COUNT(*) FROM articles GROUP BY day ORDER BY day DESC"
+
+        with self.lock:
+
+            rows = self.conn.execute(
+                query + (" LIMIT ?" if days else ""), (days,) if days else ()
+            ).fetchall()
+
+        return dict(reversed(rows))
+
+    def replace(self, table: str, records: List[Dict[str, Any]]) -> None:
+
+        # upsert by cluster_id and drop clusters that are gone, in one transaction
+        columns = ["cluster_id", "position", "timestamp", "data"]
+
+        if table == "stories":
+            columns.insert(3, "score")
+
+        rows = []
+
+        for position, record in enumerate(records):
+
+            row = [record.get("cluster_id", ""), position, record.get("timestamp", "")]
+
+            if table == "stories":
+                row.append(story_rank(record))
+
+            row.append(json.dumps(record, ensure_ascii=False))
+            rows.append(row)
+
+        keep = {row[0] for row in rows}
+        marks = ", ".join("?" * len(columns))
+
+        with self.lock, self.conn:
+
+            stored = self.conn.execute(f"SELECT cluster_id FROM {table}")
+            gone = [(c,) for (c,) in stored.fetchall() if c not in keep]
+            self.conn.executemany(f"DELETE FROM {table} WHERE cluster_id = ?", gone)
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) "
+                f"VALUES ({marks})",
+                rows,
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta VALUES (?, ?)", (f"{table}_saved", "1")
+            )
+
+    def load(self, table: str) -> List[Dict[str, Any]]:
+
+        with self.lock:
+
+            rows = self.conn.execute(
+                f"SELECT data FROM {table} ORDER BY position"
+            ).fetchall()
+
+        return [json.loads(data) for (data,) in rows]
+
+    def load_candidates(self) -> Optional[List[Dict[str, Any]]]:
+
+        with self.lock:
+
+            saved = self.conn.execute(
+                "SELECT 1 FROM meta WHERE key = 'candidates_saved'"
+            ).fetchone()
+
+        return self.load("candidates") if saved else None
+
+    def save_candidates(self, candidates: List[Dict[str, Any]]) -> None:
+
+        self.replace("candidates", candidates)
+
+    def load_stories(self) -> List[Dict[str, Any]]:
+
+        return self.load("stories")
+
+    def save_stories(self, stories: List[Dict[str, Any]]) -> None:
+
+        self.replace("stories", stories)
+
+    def top_stories(self, limit: int) -> List[Dict[str, Any]]:
+
+        # served from the stories_rank index; only `limit` rows are decoded
+        with self.lock:
+
+            rows = self.conn.execute(
+                "SELECT data FROM stories "
+                "ORDER BY score DESC, timestamp DESC, position LIMIT ?",
+                (limit,),
+            ).fetchall()
+
+        return [json.loads(data) for (data,) in rows]
+
+    def close(self) -> None:
+
+        with self.lock:
+
+            self.conn.close()
+
+
+def backend_config() -> Dict[str, Any]:
+
+    try:
+
+        defaults = load_lib("from_yml").load_feeds().get("defaults", {}) or {}
+        return defaults.get("storage", {}) or {}
+
+    except Exception as e:
+
+        print(f"Could not read storage defaults from feeds config: {e}")
+        return {}
+
+
+def sqlite_path(db_dir: Path, config: Dict[str, Any]) -> Path:
+
+    # defaults.storage.path is relative to the repository root
+    path = config.get("path")
+
+    if not path:
+        return Path(db_dir) / SQLITE_FILE.name
+
+    return Path(path) if Path(path).is_absolute() else ROOT_DIR / path
+
+
+def open_storage(db_dir: Path = DB_DIR, config: Optional[Dict[str, Any]] = None):
+
+    config = backend_config() if config is None else config
+    backend = os.environ.get("SPACE_RADAR_STORAGE") or config.get("backend", "json")
+
+    if backend == "sqlite":
+        return sqlite_storage(sqlite_path(db_dir, config))
+
+    if backend != "json":
+        raise ValueError(f"Unknown storage backend: {backend!r} (json or sqlite)")
+
+    return json_storage(db_dir)
+
+
+def import_json(db_dir: Path = DB_DIR) -> None:
+
+    source = json_storage(db_dir)
+    target = sqlite_storage(sqlite_path(db_dir, backend_config()))
+
+    articles = 0
+
+    for path in source.partitions.partition_files(source.by_date_dir):
+
+        records = list(source.partitions.iter_file(path))
+        target.add_articles(records, path.stem)
+        articles += len(records)
+
+    candidates = source.load_candidates()
+
+    if candidates is not None:
+        target.save_candidates(candidates)
+
+    stories = source.load_stories()
+    target.save_stories(stories)
+
+    print(
+        f"Imported {articles} articles, {len(candidates or [])} candidates and "
+        f"{len(stories)} stories into {target.path}"
+    )
+    target.close()
+
+
+if __name__ == "__main__":
+
+    if "--import-json" not in sys.argv:
+        print("usage: python data/agents/storage.py --import-json")
+        sys.exit(1)
+
+    import_json()
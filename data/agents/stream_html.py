@@ -0,0 +1,87 @@
+from html.parser import HTMLParser
+from typing import List
+
+SKIP_TAGS = {"script", "style", "noscript", "template", "svg"}
+
+
+class paragraph_collector(HTMLParser):
+
+    # incremental version of joining every <p>'s text: feed it decoded chunks as
+    # they arrive and stop downloading once .done is set
+
+    def __init__(self, max_chars: int = 10000):
+
+        super().__init__(convert_charrefs=True)
+
+        self.max_chars = max_chars
+        self.paragraphs: List[str] = []
+        self.current: List[str] = []
+        self.node: List[str] = []
+        self.p_depth = 0
+        self.skip_depth = 0
+        self.collected = 0
+        self.done = False
+
+    def handle_starttag(self, tag, attrs):
+
+        self.end_node()
+
+        if tag in SKIP_TAGS:
+            self.skip_depth += 1
+        elif tag == "p":
+            if self.p_depth:
+                self.end_paragraph()
+            self.p_depth = 1
+
+    def handle_endtag(self, tag):
+
+        self.end_node()
+
+        if tag in SKIP_TAGS:
+            self.skip_depth = max(0, self.skip_depth - 1)
+        elif tag == "p" and self.p_depth:
+            self.end_paragraph()
+
+    def handle_comment(self, data):
+
+        self.end_node()
+
+    def handle_data(self, data):
+
+        # a text node can arrive in several pieces when it spans two chunks,
+        # so pieces are only joined and stripped once a tag ends the node
+        if self.p_depth and not self.skip_depth:
+            self.node.append(data)
+
+    def end_node(self):
+
+        text = "".join(self.node).strip()
+        self.node = []
+
+        if text:
+            self.current.append(text)
+
+    def end_paragraph(self):
+
+        self.end_node()
+        self.p_depth = 0
+        text = " ".join(self.current)
+        self.current = []
+
+        self.paragraphs.append(text)
+        self.collected += len(text) + 1
+
+        if self.collected >= self.max_chars:
+            self.done = True
+
+    def feed(self, data: str) -> None:
+
+        if not self.done:
+            super().feed(data)
+
+    def text(self) -> str:
+
+        if self.p_depth:
+            self.end_paragraph()
+
+        return " ".join(self.paragraphs)[: self.max_chars]
@@ -0,0 +1,68 @@
+import datetime as dt
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from typing import Optional
+
+# feeds almost always emit ISO 8601 (Atom, already normalized records) or
+# RFC 822 (RSS pubDate). those two are parsed with the stdlib; only anything
+# else goes through dateutil, which is imported on first use
+
+
+def parse_fast(raw: str) -> Optional[dt.datetime]:
+
+    try:
+        return dt.datetime.fromisoformat(raw)
+    except ValueError:
+        pass
+
+    # RFC 822 always carries a time, so a bare "12 May 2024" falls through
+    if ":" in raw:
+
+        try:
+            return parsedate_to_datetime(raw)
+        except (TypeError, ValueError, IndexError):
+            pass
+
+    return None
+
+
+@lru_cache(maxsize=4096)
+def parse(raw: str) -> Optional[dt.datetime]:
+
+    # timezone-aware UTC datetime, naive input is taken as UTC; None if unparsable
+    raw = (raw or "").strip()
+
+    if not raw:
+        return None
+
+    value = parse_fast(raw)
+
+    if value is None:
+
+        try:
+
+            from dateutil import parser as dateparser
+
+            value = dateparser.parse(raw)
+
+        except Exception:
+
+            return None
+
+    if value is None:
+        return None
+
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=dt.timezone.utc)
+
+    try:
+        return value.astimezone(dt.timezone.utc)
+    except (OverflowError, ValueError):
+        return None
+
+
+def to_iso(raw: str) -> str:
+
+    value = parse(raw)
+
+    return value.isoformat() if value is not None else ""
@@ -10,10 +10,9 @@ LLM_SCRIPT = ROOT_DIR / "agents" / "llm" / "build.py"
 CLEAN_SCRIPT = ROOT_DIR / "agents" / "cluster" / "clean.py"
 BUILD_SCRIPT = ROOT_DIR / "agents" / "cluster" / "build.py"
 DB_DIR = ROOT_DIR / "data" / "db"
-stories_file = DB_DIR / "stories.json"
 
 
-def run_script(script_path, description):
+def run_script(script_path, description, args=()):
     print(f"\n=== {description} ===")
     start = time.time()
 
@@ -24,9 +23,9 @@ def run_script(script_path, description):
             python_executable = str(venv_python)
         else:
             python_executable = sys.executable
-        print(python_executable, script_path)
+        print(python_executable, script_path, *args)
         result = subprocess.run(
-            [python_executable, str(script_path)],
+            [python_executable, str(script_path), *args],
             cwd=ROOT_DIR,
             timeout=3000,  # 5 minute timeout
         )
@@ -57,48 +56,73 @@ def check_outputs():
     print("\n=== Checking Pipeline Outputs ===")
 
     index_file = DB_DIR / "index.json"
-    by_date_dir = DB_DIR / "by_date"
-    story_candidates_file = DB_DIR / "story_candidates.json"
+    ids_dir = DB_DIR / "ids"
 
-    if index_file.exists():
-        print(f"✓ Index file exists: {index_file}")
+    if ids_dir.exists() or index_file.exists():
+        print(f"✓ Index exists: {ids_dir if ids_dir.exists() else index_file}")
         try:
-            import json
+            import importlib.util
 
-            with open(index_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                key = "id" if "id" in data else "ids"
-                count = len(data.get(key, []))
-                print(f"  - Contains {count} article IDs")
+            spec = importlib.util.spec_from_file_location(
+                "idstore", ROOT_DIR / "data" / "agents" / "idstore.py"
+            )
+            idstore = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(idstore)
+
+            # reads the id store, or the legacy {"id": [...]} / {"ids": [...]}
+            count = idstore.count_ids(ids_dir, index_file)
+            print(f"  - Contains {count} article IDs")
         except Exception as e:
             print(f"  - Error reading index: {e}")
     else:
-        print(f"✗ Missing index file: {index_file}")
-
-    if by_date_dir.exists():
-        date_files = list(by_date_dir.glob("*.json"))
-        print(f"✓ By-date directory exists with {len(date_files)} files")
-        for file in sorted(date_files)[-3:]:  # Show last 3 files
-            try:
-                import json
-
-                with open(file, "r", encoding="utf-8") as f:
-                    articles = json.load(f)
-                    print(f"  - {file.name}: {len(articles)} articles")
-            except Exception as e:
-                print(f"  - {file.name}: Error reading ({e})")
+        print(f"✗ Missing index: {ids_dir}")
+
+    # articles, candidates and stories, from whichever backend is configured
+    try:
+        import importlib.util
+
+        spec = importlib.util.spec_from_file_location(
+            "storage", ROOT_DIR / "data" / "agents" / "storage.py"
+        )
+        storage = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(storage)
+
+        store = storage.open_storage(DB_DIR)
+
+        try:
+            counts = store.article_counts(days=3)
+            candidates = store.load_candidates()
+            stories = store.load_stories()
+        finally:
+            store.close()
+    except Exception as e:
+        print(f"✗ Error reading storage: {e}")
+        return
+
+    backend = type(store).__name__
+    if counts:
+        print(f"✓ Articles stored ({backend})")
+        for day, count in counts.items():  # Show last 3 days
+            print(f"  - {day}: {count} articles")
+    else:
+        print(f"✗ No stored articles ({backend})")
+
+    if candidates is not None:
+        print(f"✓ Story candidates: {len(candidates)}")
     else:
-        print(f"✗ Missing by-date directory: {by_date_dir}")
+        print("✗ Missing story candidates")
 
-    if stories_file.exists():
-        print(f"✓ Final stories file exists: {stories_file}")
+    if stories:
+        print(f"✓ Final stories: {len(stories)}")
     else:
-        print(f"✗ Missing final stories file: {stories_file}")
+        print("✗ Missing final stories")
+
 
+def run_pipeline(replay=False):
 
-def run_pipeline():
+    clean_args = ["--replay"] if replay else []
 
-    if not run_script(CLEAN_SCRIPT, "Article Cleaning & DB Update"):
+    if not run_script(CLEAN_SCRIPT, "Article Cleaning & DB Update", clean_args):
         print("Pipeline failed at cleaning step")
         return 1
     if not run_script(BUILD_SCRIPT, "Story Clustering & Building"):
@@ -117,8 +141,11 @@ def main():
 
     overall_start = time.time()
 
+    # --replay feeds the whole chain from the raw fetch archive (no network)
+    clean_args = ["--replay"] if "--replay" in sys.argv else []
+
     # Step 1: Clean and process articles
-    if not run_script(CLEAN_SCRIPT, "Article Cleaning & DB Update"):
+    if not run_script(CLEAN_SCRIPT, "Article Cleaning & DB Update", clean_args):
         print("Pipeline failed at cleaning step")
         return 1
 
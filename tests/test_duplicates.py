@@ -0,0 +1,64 @@
+import importlib.util
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+
+spec = importlib.util.spec_from_file_location(
+    "fetch", ROOT_DIR / "data" / "agents" / "fetch.py"
+)
+fetch = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(fetch)
+
+
+def entry(url, source, text="short", fulltext=False):
+
+    return {
+        "url": url,
+        "guid": "",
+        "title": url,
+        "ts": "",
+        "text": text,
+        "fulltext": fulltext,
+        "sources": [source],
+    }
+
+
+def make_fetcher(tmp_path, replay=False):
+
+    f = fetch.fetcher()
+    f.known = fetch.known.known_index(tmp_path / "known_entries.json")
+    f.replay = replay
+    return f
+
+
+def test_first_feed_in_config_order_owns_the_url(tmp_path):
+
+    for replay in (False, True):
+
+        f = make_fetcher(tmp_path, replay)
+        first = [entry("http://a.example/x", "NASA")]
+        second = [
+            entry("http://a.example/x", "ESA", "full text", fulltext=True),
+            entry("http://a.example/y", "ESA"),
+        ]
+
+        f.merge_duplicates([("NASA", first), ("ESA", second)])
+
+        assert [e["url"] for e in first] == ["http://a.example/x"]
+        assert [e["url"] for e in second] == ["http://a.example/y"]
+        assert first[0]["sources"] == ["NASA", "ESA"]
+
+        # the owner takes the copy's full text instead of fetching its page
+        assert first[0]["text"] == "full text" and first[0]["fulltext"]
+        assert f.duplicates == 1
+
+
+def test_url_from_an_earlier_run_stays_with_its_feed(tmp_path):
+
+    f = make_fetcher(tmp_path)
+    f.known.add("http://a.example/x", "", "NASA")
+    entries = [entry("http://a.example/x", "ESA")]
+
+    f.merge_duplicates([("ESA", entries)])
+
+    assert entries == []
@@ -0,0 +1,157 @@
+import json
+import importlib.util
+from pathlib import Path
+
+import requests
+
+ROOT_DIR = Path(__file__).parent.parent
+
+
+def load_lib(path: Path):
+
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    lib = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(lib)
+    return lib
+
+
+fetch = load_lib(ROOT_DIR / "data" / "agents" / "fetch.py")
+clean = load_lib(ROOT_DIR / "agents" / "cluster" / "clean.py")
+
+FEED_URL = "http://feeds.example/rss"
+FEED = (
+    b'<?xml version="1.0"?><rss version="2.0"><channel><title>T</title>'
+    b"<item><title>Page that loads</title><link>http://news.example/ok</link>"
+    b"<guid>ok</guid><description>short</description></item>"
+    b"<item><title>Page that fails</title><link>http://news.example/down</link>"
+    b"<guid>down</guid><description>short</description></item>"
+    b"</channel></rss>"
+)
+
+
+class response:
+
+    def __init__(self, url, status, body):
+
+        self.url = url
+        self.status_code = status
+        self.ok = status < 400
+        self.content = body
+        self.encoding = "utf-8"
+        self.headers = {"Content-Type": "text/html; charset=utf-8", "ETag": "v1"}
+
+    def iter_content(self, chunk_size):
+
+        yield self.content
+
+    def close(self):
+
+        pass
+
+    def raise_for_status(self):
+
+        if not self.ok:
+            raise requests.exceptions.HTTPError(f"{self.status_code}", response=self)
+
+
+class session:
+
+    def get(self, url, headers=None, timeout=None, stream=False):
+
+        if url == FEED_URL:
+            return response(url, 200, FEED)
+
+        if url.endswith("/down"):
+            raise requests.exceptions.ReadTimeout("timed out")
+
+        return response(url, 200, b"<p>" + b"Full article text. " * 20 + b"</p>")
+
+
+def make_fetcher(tmp_path):
+
+    f = fetch.fetcher()
+    f.session = session()
+    f.archive_enabled = False
+    f.known = fetch.known.known_index(tmp_path / "known_entries.json")
+    f.cache = fetch.feed_cache.feed_cache(tmp_path / "feed_cache.json")
+    return f
+
+
+def test_failed_page_fetch_is_not_remembered(tmp_path):
+
+    f = make_fetcher(tmp_path)
+    outputs = f.pull(FEED_URL, source="News")
+
+    assert [o["fulltext"] for o in outputs] == [True, False]
+
+    entries = [
+        {
+            "article_url": o["url"],
+            "guid": o["guid"],
+            "source": "News",
+            "fulltext": o["fulltext"],
+            "id": o["guid"],
+        }
+        for o in outputs
+    ]
+    f.remember(clean.rememberable(entries, indexed_ids=set()))
+
+    assert not f.wants_page("http://news.example/ok", "ok")
+    assert f.wants_page("http://news.example/down", "down")
+
+    # the feed is downloaded in full next poll, so the failed entry comes back
+    assert f.cache.request_headers(FEED_URL) == {}
+
+
+def test_stored_entry_is_remembered_without_its_page():
+
+    entries = [
+        {"article_url": "http://news.example/a", "fulltext": False, "id": "a"},
+        {"article_url": "http://news.example/b", "fulltext": False, "id": "b"},
+    ]
+
+    assert clean.rememberable(entries, indexed_ids={"a"}) == entries[:1]
+
+
+def test_entries_no_feed_carries_are_forgotten(tmp_path):
+
+    path = tmp_path / "known_entries.json"
+
+    # the older format, with no last-seen day, is read as seen today
+    path.write_text(
+        json.dumps({"urls": {"http://news.example/old": "News"}, "guids": ["old"]})
+    )
+
+    known = fetch.known.known_index(path, keep_days=30)
+    known.add("http://news.example/new", "new", "News")
+    known.seen["http://news.example/old"] = "2000-01-01"
+    known.guids["old"] = "2000-01-01"
+    known.save()
+
+    known = fetch.known.known_index(path, keep_days=30)
+
+    assert known.contains("http://news.example/new", "new")
+    assert not known.contains("http://news.example/old")
+    assert not known.contains(guid="old")
+
+
+def test_probe_that_fails_on_our_side_releases_the_host(tmp_path):
+
+    f = make_fetcher(tmp_path)
+    f.breaker = fetch.breaker.circuit_breaker(failure_threshold=1, reset_after_sec=0)
+    f.breaker.record_failure("http://news.example/ok")
+
+    def read(r):
+        raise UnicodeDecodeError("utf-8", b"", 0, 1, "bad")
+
+    # the first call is the half-open probe; it must not hold the host shut
+    for _ in range(2):
+
+        try:
+            f.get("http://news.example/ok", read=read)
+        except UnicodeDecodeError:
+            pass
+        else:
+            raise AssertionError("read error was swallowed")
+
+    assert f.get("http://news.example/ok") is not None
@@ -0,0 +1,102 @@
+import importlib.util
+import random
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+
+
+def load_lib(path: Path):
+
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    lib = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(lib)
+    return lib
+
+
+fetch = load_lib(ROOT_DIR / "data" / "agents" / "fetch.py")
+idstore = load_lib(ROOT_DIR / "data" / "agents" / "idstore.py")
+clean = load_lib(ROOT_DIR / "agents" / "cluster" / "clean.py")
+
+FEED_URL = "http://feeds.example/rss"
+WORDS = "lunar rocket orbit crew capsule booster engine telescope mission launch"
+
+
+def page(seed: int) -> bytes:
+
+    rng = random.Random(seed)
+    words = WORDS.split()
+    sentences = [
+        " ".join(rng.choice(words) for _ in range(12)).capitalize() + "."
+        for _ in range(20)
+    ]
+    return "".join(f"<p>{s}</p>" for s in sentences).encode("utf-8")
+
+
+def make_archive(root: Path):
+
+    archive = fetch.archive.raw_archive(root)
+    items = ""
+
+    for i in range(3):
+
+        url = f"http://news.example/story-{i}"
+        archive.put(url, page(i), "text/html; charset=utf-8")
+        items += (
+            f"<item><title>Mission update number {i}</title><link>{url}</link>"
+            f"<guid>{i}</guid><pubDate>Mon, 17 Nov 2025 10:00:00 +0000</pubDate>"
+            f"<description>short</description></item>"
+        )
+
+    feed = f'<?xml version="1.0"?><rss version="2.0"><channel>{items}</channel></rss>'
+    archive.put(FEED_URL, feed.encode("utf-8"), "application/rss+xml", "feed")
+
+    return archive
+
+
+def run_stage(archive, indexed_ids, tmp_path, replay=True):
+
+    f = fetch.fetcher()
+    f.archive = archive
+    f.replay = replay
+    f.known = fetch.known.known_index(tmp_path / "known_entries.json")
+
+    raw = [
+        {
+            "source": "News",
+            "article_url": o["url"],
+            "title": o["title"],
+            "timestamp": o["ts"],
+            "text": o["text"],
+        }
+        for o in f.pull(FEED_URL, source="News")
+    ]
+
+    cleaned = clean.cleaner().process_articles(
+        raw, skip_ids=clean.skip_ids_for(indexed_ids, replay)
+    )
+    indexed_ids.add_many(a["id"] for a in cleaned)
+
+    return len(cleaned)
+
+
+def test_replaying_an_ingested_archive_cleans_it_again(tmp_path):
+
+    archive = make_archive(tmp_path / "archive")
+    indexed_ids = idstore.id_store(tmp_path / "ids", tmp_path / "index.json")
+
+    try:
+
+        first = run_stage(archive, indexed_ids, tmp_path)
+        second = run_stage(archive, indexed_ids, tmp_path)
+
+    finally:
+
+        indexed_ids.close()
+
+    assert first == second == 3
+
+
+def test_live_runs_still_skip_indexed_ids(tmp_path):
+
+    assert clean.skip_ids_for({"a"}, replay=False) == {"a"}
+    assert clean.skip_ids_for({"a"}, replay=True) is None
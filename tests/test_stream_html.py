@@ -0,0 +1,65 @@
+import importlib.util
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+ROOT_DIR = Path(__file__).parent.parent
+
+
+def load_lib(name: str):
+
+    spec = importlib.util.spec_from_file_location(
+        name, ROOT_DIR / "data" / "agents" / f"{name}.py"
+    )
+    lib = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(lib)
+    return lib
+
+
+stream_html = load_lib("stream_html")
+
+PAGE = (
+    "<html><head><script>var x = '<p>no</p>';</script></head><body>"
+    "<p>The rocket lifted off at dawn.</p>"
+    "<p>Second <b>stage</b> separation\n  went well &amp; on time.</p>"
+    "<p>  </p><p>Last paragraph</p></body></html>"
+)
+
+
+def expected(html: str) -> str:
+
+    soup = BeautifulSoup(html, "html.parser")
+    return " ".join(p.get_text(" ", strip=True) for p in soup.find_all("p"))
+
+
+def collect(pieces) -> str:
+
+    collector = stream_html.paragraph_collector()
+
+    for piece in pieces:
+
+        collector.feed(piece)
+
+    return collector.text()
+
+
+def test_whole_body_matches_get_text():
+
+    assert collect([PAGE]) == expected(PAGE)
+
+
+def test_split_body_keeps_words_whole():
+
+    # every split point, including inside words, tags and entities
+    for i in range(1, len(PAGE)):
+
+        assert collect([PAGE[:i], PAGE[i:]]) == expected(PAGE), i
+
+
+def test_stops_once_enough_text():
+
+    collector = stream_html.paragraph_collector(max_chars=10)
+    collector.feed("<p>0123456789</p>")
+
+    assert collector.done
+    assert collector.text() == "0123456789"